@@ -1,17 +1,26 @@
-from fastapi import FastAPI, UploadFile, File, HTTPException, Depends
+from fastapi import FastAPI, UploadFile, File, HTTPException, Depends, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel
-from typing import List, Optional, Dict, Any, Union
+from typing import List, NamedTuple, Optional, Dict, Any, Tuple, Union
 import pandas as pd
 import numpy as np
+import pyarrow.dataset as ds
 from datetime import datetime, timedelta
 import json
+import hashlib
+import orjson
 import os
 import logging
+import threading
+from functools import lru_cache
+from cachetools import TTLCache
 from rag_pipeline import RetailRAGPipeline
-from utils.api_integrations import ExternalDataAnalyzer, TwitterAPI, WeatherAPI
-from models.forecasting import ProphetForecaster, LSTMForecaster, EnsembleForecaster
+from utils.api_integrations import get_external_analyzer, get_weather_api
+from models.forecasting import ProphetForecaster, LSTMForecaster, EnsembleForecaster, ensure_parquet
 from models.inventory import InventoryOptimizer
+import model_server
 
 os.environ["TF_ENABLE_ONEDNN_OPTS"] = "0"  # Disable oneDNN optimizations for TensorFlow
 
@@ -19,7 +28,11 @@ os.environ["TF_ENABLE_ONEDNN_OPTS"] = "0"  # Disable oneDNN optimizations for Te
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-app = FastAPI(title="Retail Demand Forecasting API")
+app = FastAPI(title="Retail Demand Forecasting API", default_response_class=ORJSONResponse)
+
+# Compress large JSON bodies (added before CORS so CORS stays the outermost
+# middleware and answers preflight requests without passing through gzip)
+app.add_middleware(GZipMiddleware, minimum_size=1024)
 
 # Enable CORS
 app.add_middleware(
@@ -32,21 +45,33 @@ app.add_middleware(
 
 # Data paths
 DATA_PATH = "data/store_S004_inventory.csv"
-CHROMA_DB_PATH = "./chroma_db"
+FAISS_INDEX_PATH = "./faiss_index"
 
-# Initialize API components
-twitter_api = TwitterAPI()
-weather_api = WeatherAPI()
-external_analyzer = ExternalDataAnalyzer()
+# Low-cardinality string columns stored as pandas categoricals
+CATEGORICAL_DTYPES = {
+    'Product ID': 'category',
+    'Store ID': 'category',
+    'Category': 'category',
+    'Region': 'category'
+}
 
-# Initialize core components (will be properly initialized in startup event)
-rag_pipeline = RetailRAGPipeline(DATA_PATH)
+# Count columns narrowed to the smallest integer dtype that holds them
+INTEGER_COLUMNS = ('Inventory Level', 'Units Sold', 'Units Ordered')
+
+# Columns read by the analytics endpoints
+ANALYTICS_COLUMNS = ('Date', 'Product ID', 'Store ID', 'Category', 'Inventory Level', 'Units Sold', 'Price')
 
+# Initialize core components (will be properly initialized in startup event)
+rag_pipeline = None
 forecaster = None
 lstm_forecaster = None
 ensemble_forecaster = None
 inventory_optimizer = None
 
+# Serialized forecast responses keyed by (data mtime, product_id, store_id, forecast_days, forecast_type)
+forecast_cache = TTLCache(maxsize=1024, ttl=300)
+forecast_cache_lock = threading.Lock()
+
 # Model definitions
 class ForecastRequest(BaseModel):
     product_id: str
@@ -74,17 +99,155 @@ class Settings(BaseModel):
     prophet_weight: float = 0.6
     notification_email: Optional[str] = None
 
+# Pre-serialized bodies for constant responses
+ROOT_RESPONSE_BODY = orjson.dumps({"message": "Retail Demand Forecasting API", "version": "1.0.0"})
+settings_response_body = orjson.dumps({"settings": Settings().model_dump()})
+settings_etag = hashlib.md5(settings_response_body).hexdigest()
+
 # Helper to load data
-def load_retail_data():
-    """Load the retail inventory data"""
+class RetailData(NamedTuple):
+    """Parsed inventory frame plus lookup tables derived from it"""
+    df: pd.DataFrame
+    products: Optional[pd.DataFrame]
+    stores: Optional[pd.DataFrame]
+    categories: Optional[List[str]]
+    by_product_store: Optional[pd.DataFrame]
+
+def _unique_rows(df: pd.DataFrame, columns: List[str]) -> Optional[pd.DataFrame]:
+    """
+    Distinct rows over the given columns
+    
+    Returns None if any of the columns is missing.
+    """
+    if not set(columns).issubset(df.columns):
+        return None
+    return df[columns].drop_duplicates().reset_index(drop=True)
+
+def _index_by_product_store(df: pd.DataFrame) -> Optional[pd.DataFrame]:
+    """
+    Copy of the frame under a sorted (Product ID, Store ID, Date) MultiIndex
+    
+    Selecting one product/store pair from it is an index lookup rather than two
+    full-column scans. Returns None if the ID columns are missing.
+    """
+    if not {'Product ID', 'Store ID'}.issubset(df.columns):
+        return None
+    return df.reset_index().set_index(['Product ID', 'Store ID', 'Date']).sort_index()
+
+def select_retail_rows(
+    bundle: RetailData,
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    product_id: Optional[str] = None,
+    store_id: Optional[str] = None,
+    category: Optional[str] = None
+) -> pd.DataFrame:
+    """
+    Rows of the inventory data matching the analytics filters, indexed by Date
+    
+    Args:
+        bundle (RetailData): Loaded inventory data
+        start_date (str, optional): First date to include
+        end_date (str, optional): Last date to include
+        product_id (str, optional): Product ID to filter by
+        store_id (str, optional): Store ID to filter by
+        category (str, optional): Category to filter by
+    
+    Returns:
+        pd.DataFrame: Matching rows sorted by Date
+    """
+    if product_id and store_id and bundle.by_product_store is not None:
+        # Single product/store pair: look it up in the MultiIndex
+        try:
+            df = bundle.by_product_store.loc[(product_id, store_id)]
+        except KeyError:
+            return bundle.df.iloc[0:0]
+        product_id = store_id = None
+    else:
+        df = bundle.df
+    
+    # Slice the sorted Date index before applying the column filters
+    df = df.loc[pd.to_datetime(start_date):pd.to_datetime(end_date)]
+    
+    if product_id:
+        df = df[df['Product ID'] == product_id]
+    
+    if store_id:
+        df = df[df['Store ID'] == store_id]
+    
+    if category:
+        df = df[df['Category'] == category]
+    
+    return df
+
+def _read_frame(path: str, usecols: Optional[Tuple[str, ...]] = None) -> pd.DataFrame:
+    """
+    Read the inventory data from the Parquet dataset shared with the forecasters
+    
+    The dataset is built from the CSV on first use and whenever the CSV changes,
+    after which loads skip CSV parsing and read just the requested columns.
+    """
+    dataset = ds.dataset(ensure_parquet(path), format='parquet', partitioning='hive')
+    columns = [c for c in dataset.schema.names if c == 'Date' or not usecols or c in usecols]
+    df = dataset.to_table(columns=columns).to_pandas()
+    
+    df = df.astype({c: dtype for c, dtype in CATEGORICAL_DTYPES.items() if c in df.columns})
+    df = df.sort_values('Date', kind='stable').set_index('Date')
+    
+    for column in INTEGER_COLUMNS:
+        if column in df.columns:
+            df[column] = pd.to_numeric(df[column], downcast='integer')
+    
+    return df
+
+@lru_cache(maxsize=4)
+def _load_data(path: str, mtime: float, usecols: Optional[Tuple[str, ...]] = None) -> RetailData:
+    """Load the data and build its lookup tables once per (path, modification time, columns)"""
+    df = _read_frame(path, usecols)
+    logger.info(f"Loaded retail data with shape: {df.shape}")
+    
+    return RetailData(
+        df=df,
+        products=_unique_rows(df, ['Product ID', 'Name', 'Category']),
+        stores=_unique_rows(df, ['Store ID', 'Region']),
+        categories=df['Category'].cat.categories.tolist() if 'Category' in df.columns else None,
+        by_product_store=_index_by_product_store(df)
+    )
+
+def load_retail_bundle(usecols: Optional[Tuple[str, ...]] = None) -> RetailData:
+    """
+    Load the retail inventory data together with its lookup tables
+    
+    The parsed frames are cached until the file changes on disk and are shared
+    between requests, so callers must filter them rather than mutate them in place.
+    
+    Args:
+        usecols (Tuple[str, ...], optional): Only read these columns (missing ones are skipped)
+    """
     try:
-        df = pd.read_csv(DATA_PATH)
-        logger.info(f"Loaded retail data with shape: {df.shape}")
-        return df
+        return _load_data(DATA_PATH, os.path.getmtime(DATA_PATH), usecols)
     except Exception as e:
         logger.error(f"Error loading retail data: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Error loading data: {str(e)}")
 
+def load_retail_data(usecols: Optional[Tuple[str, ...]] = None) -> pd.DataFrame:
+    """Load the retail inventory data"""
+    return load_retail_bundle(usecols).df
+
+# Conditional GET helpers
+def make_etag(*parts: Any) -> str:
+    """Build a quoted ETag from the given parts"""
+    return '"' + hashlib.md5("|".join(map(str, parts)).encode()).hexdigest() + '"'
+
+def data_etag(request: Request) -> str:
+    """ETag for a response derived from the inventory data and the request URL"""
+    return make_etag(os.path.getmtime(DATA_PATH), request.url.path, request.url.query)
+
+def is_not_modified(request: Request, etag: str) -> bool:
+    """Check whether the client's If-None-Match header already holds the ETag"""
+    if_none_match = request.headers.get("if-none-match")
+    return bool(if_none_match) and etag in [tag.strip() for tag in if_none_match.split(",")]
+
 # Startup event
 @app.on_event("startup")
 async def startup_event():
@@ -92,8 +255,21 @@ async def startup_event():
     global rag_pipeline, forecaster, lstm_forecaster, ensemble_forecaster, inventory_optimizer
     
     try:
+        # Use the shared model server when configured instead of loading the
+        # heavy components separately in every worker process
+        model_server_address = os.getenv("MODEL_SERVER_ADDRESS")
+        if model_server_address:
+            components = model_server.connect(model_server_address)
+            rag_pipeline = components["rag_pipeline"]
+            forecaster = components["forecaster"]
+            lstm_forecaster = components["lstm_forecaster"]
+            ensemble_forecaster = components["ensemble_forecaster"]
+            inventory_optimizer = components["inventory_optimizer"]
+            logger.info("Startup initialization complete")
+            return
+        
         logger.info("Initializing RAG pipeline...")
-        rag_pipeline = RetailRAGPipeline(DATA_PATH)
+        rag_pipeline = RetailRAGPipeline(DATA_PATH, vector_store_dir=FAISS_INDEX_PATH)
         rag_pipeline.initialize_pipeline()
         
         logger.info("Initializing forecasting models...")
@@ -111,25 +287,33 @@ async def startup_event():
 # Routes
 @app.get("/")
 async def root():
-    return {"message": "Retail Demand Forecasting API", "version": "1.0.0"}
+    return Response(content=ROOT_RESPONSE_BODY, media_type="application/json")
 
 @app.post("/api/forecast")
-async def get_forecast(request: ForecastRequest):
+def get_forecast(request: ForecastRequest):
     """
     Generate demand forecasts for a specific product and store
     """
     try:
+        # The data file's mtime keeps forecasts of data replaced on disk from being served
+        cache_key = (os.path.getmtime(DATA_PATH), request.product_id, request.store_id,
+                     request.forecast_days, request.forecast_type.lower())
+        with forecast_cache_lock:
+            cached_response = forecast_cache.get(cache_key)
+        if cached_response is not None:
+            logger.info(f"Returning cached forecast for Product ID: {request.product_id}, Store ID: {request.store_id}")
+            return cached_response
+        
         logger.info(f"Generating forecast for Product ID: {request.product_id}, Store ID: {request.store_id}")
         
         if request.forecast_type.lower() == "prophet":
             if not forecaster:
                 raise HTTPException(status_code=500, detail="Prophet forecaster not initialized")
             
-            # Train on the specific product/store
-            forecaster.train(product_id=request.product_id, store_id=request.store_id)
-            
-            # Generate forecast
-            forecast = forecaster.predict(periods=request.forecast_days)
+            # Train on the specific product/store and forecast it; forecast() holds the
+            # forecaster's lock throughout, also when it lives in the model server
+            forecast = forecaster.forecast(product_id=request.product_id, store_id=request.store_id,
+                                           periods=request.forecast_days)
             
             # Prepare response
             response = {
@@ -141,11 +325,9 @@ async def get_forecast(request: ForecastRequest):
             if not lstm_forecaster:
                 raise HTTPException(status_code=500, detail="LSTM forecaster not initialized")
             
-            # Train on the specific product/store
-            lstm_forecaster.train(product_id=request.product_id, store_id=request.store_id)
-            
-            # Generate forecast
-            lstm_values = lstm_forecaster.predict(periods=request.forecast_days)
+            # Train on the specific product/store and forecast it
+            lstm_values = lstm_forecaster.forecast(product_id=request.product_id, store_id=request.store_id,
+                                                   periods=request.forecast_days)
             
             # Create date range for forecast
             start_date = datetime.now()
@@ -167,11 +349,10 @@ async def get_forecast(request: ForecastRequest):
             if not ensemble_forecaster:
                 raise HTTPException(status_code=500, detail="Ensemble forecaster not initialized")
             
-            # Train on the specific product/store
-            ensemble_forecaster.train(product_id=request.product_id, store_id=request.store_id)
-            
-            # Generate forecast
-            ensemble_forecast = ensemble_forecaster.predict(periods=request.forecast_days)
+            # Train on the specific product/store and forecast it
+            ensemble_forecast = ensemble_forecaster.forecast(product_id=request.product_id,
+                                                             store_id=request.store_id,
+                                                             periods=request.forecast_days)
             
             # Prepare response
             response = {
@@ -179,6 +360,9 @@ async def get_forecast(request: ForecastRequest):
                 "model_type": "ensemble"
             }
         
+        with forecast_cache_lock:
+            forecast_cache[cache_key] = response
+        
         return response
     
     except Exception as e:
@@ -186,7 +370,7 @@ async def get_forecast(request: ForecastRequest):
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/api/inventory/recommendations")
-async def get_inventory_recommendations(request: InventoryRequest):
+def get_inventory_recommendations(request: InventoryRequest):
     """
     Get inventory optimization recommendations for a specific product and store
     """
@@ -210,7 +394,7 @@ async def get_inventory_recommendations(request: InventoryRequest):
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/api/inventory/health")
-async def get_inventory_health(request: InventoryRequest):
+def get_inventory_health(request: InventoryRequest):
     """
     Get overall inventory health metrics
     """
@@ -234,7 +418,7 @@ async def get_inventory_health(request: InventoryRequest):
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/api/rag/query")
-async def query_rag_pipeline(request: RAGQueryRequest):
+def query_rag_pipeline(request: RAGQueryRequest):
     """
     Query the RAG pipeline for contextual insights
     """
@@ -259,58 +443,71 @@ async def query_rag_pipeline(request: RAGQueryRequest):
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/api/products")
-async def get_products():
+def get_products(request: Request):
     """
     Get list of products from the inventory data
     """
     try:
-        df = load_retail_data()
+        etag = data_etag(request)
+        if is_not_modified(request, etag):
+            return Response(status_code=304, headers={"ETag": etag})
         
-        # Extract unique products with key information
-        products = df[['Product ID', 'Name', 'Category']].drop_duplicates()
+        # Unique products with key information, precomputed at load time
+        products = load_retail_bundle().products
+        if products is None:
+            raise HTTPException(status_code=500, detail="Product columns not found in inventory data")
         
-        return {"products": products.to_dict('records')}
+        return ORJSONResponse({"products": products.to_dict('records')}, headers={"ETag": etag})
     
     except Exception as e:
         logger.error(f"Error retrieving products: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/api/stores")
-async def get_stores():
+def get_stores(request: Request):
     """
     Get list of stores from the inventory data
     """
     try:
-        df = load_retail_data()
+        etag = data_etag(request)
+        if is_not_modified(request, etag):
+            return Response(status_code=304, headers={"ETag": etag})
         
-        # Extract unique stores with region information
-        stores = df[['Store ID', 'Region']].drop_duplicates()
+        # Unique stores with region information, precomputed at load time
+        stores = load_retail_bundle().stores
+        if stores is None:
+            raise HTTPException(status_code=500, detail="Store columns not found in inventory data")
         
-        return {"stores": stores.to_dict('records')}
+        return ORJSONResponse({"stores": stores.to_dict('records')}, headers={"ETag": etag})
     
     except Exception as e:
         logger.error(f"Error retrieving stores: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/api/categories")
-async def get_categories():
+def get_categories(request: Request):
     """
     Get list of product categories from the inventory data
     """
     try:
-        df = load_retail_data()
+        etag = data_etag(request)
+        if is_not_modified(request, etag):
+            return Response(status_code=304, headers={"ETag": etag})
         
-        # Extract unique categories
-        categories = df['Category'].unique().tolist()
+        # Unique categories, precomputed at load time
+        categories = load_retail_bundle().categories
+        if categories is None:
+            raise HTTPException(status_code=500, detail="Category column not found in inventory data")
         
-        return {"categories": categories}
+        return ORJSONResponse({"categories": categories}, headers={"ETag": etag})
     
     except Exception as e:
         logger.error(f"Error retrieving categories: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/api/analytics/sales")
-async def get_sales_analytics(
+def get_sales_analytics(
+    request: Request,
     start_date: Optional[str] = None,
     end_date: Optional[str] = None,
     product_id: Optional[str] = None,
@@ -321,45 +518,37 @@ async def get_sales_analytics(
     Get sales analytics data filtered by various parameters
     """
     try:
-        df = load_retail_data()
-        
-        # Apply filters
-        if product_id:
-            df = df[df['Product ID'] == product_id]
+        etag = data_etag(request)
+        if is_not_modified(request, etag):
+            return Response(status_code=304, headers={"ETag": etag})
         
-        if store_id:
-            df = df[df['Store ID'] == store_id]
-        
-        if category:
-            df = df[df['Category'] == category]
-        
-        if start_date:
-            start_date = pd.to_datetime(start_date)
-            df = df[df['Date'] >= start_date]
-        
-        if end_date:
-            end_date = pd.to_datetime(end_date)
-            df = df[df['Date'] <= end_date]
+        df = select_retail_rows(
+            load_retail_bundle(ANALYTICS_COLUMNS), start_date, end_date, product_id, store_id, category
+        )
         
         # Group by date and calculate total sales
         if not df.empty:
-            sales_data = df.groupby('Date')['Units Sold'].sum().reset_index()
-            sales_data['Date'] = sales_data['Date'].dt.strftime('%Y-%m-%d')
+            sales_data = df.groupby('Date', sort=True).agg(
+                **{'Units Sold': ('Units Sold', 'sum'), 'Price': ('Price', 'mean')}
+            )
             
             # Calculate revenue
-            price_data = df.groupby('Date')['Price'].mean().reset_index()
-            sales_data['Revenue'] = sales_data['Units Sold'] * price_data['Price']
+            sales_data['Revenue'] = sales_data['Units Sold'] * sales_data.pop('Price')
             
-            return {"sales": sales_data.to_dict('records')}
+            sales_data = sales_data.reset_index()
+            sales_data['Date'] = sales_data['Date'].dt.strftime('%Y-%m-%d')
+            
+            return ORJSONResponse({"sales": sales_data.to_dict('records')}, headers={"ETag": etag})
         else:
-            return {"sales": []}
+            return ORJSONResponse({"sales": []}, headers={"ETag": etag})
     
     except Exception as e:
         logger.error(f"Error retrieving sales analytics: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/api/analytics/inventory")
-async def get_inventory_analytics(
+def get_inventory_analytics(
+    request: Request,
     start_date: Optional[str] = None,
     end_date: Optional[str] = None,
     product_id: Optional[str] = None,
@@ -370,38 +559,29 @@ async def get_inventory_analytics(
     Get inventory analytics data filtered by various parameters
     """
     try:
-        df = load_retail_data()
-        
-        # Apply filters
-        if product_id:
-            df = df[df['Product ID'] == product_id]
-        
-        if store_id:
-            df = df[df['Store ID'] == store_id]
+        etag = data_etag(request)
+        if is_not_modified(request, etag):
+            return Response(status_code=304, headers={"ETag": etag})
         
-        if category:
-            df = df[df['Category'] == category]
-        
-        if start_date:
-            start_date = pd.to_datetime(start_date)
-            df = df[df['Date'] >= start_date]
-        
-        if end_date:
-            end_date = pd.to_datetime(end_date)
-            df = df[df['Date'] <= end_date]
+        df = select_retail_rows(
+            load_retail_bundle(ANALYTICS_COLUMNS), start_date, end_date, product_id, store_id, category
+        )
         
         # Group by date and calculate average inventory
         if not df.empty:
-            inventory_data = df.groupby('Date')['Inventory Level'].mean().reset_index()
-            inventory_data['Date'] = inventory_data['Date'].dt.strftime('%Y-%m-%d')
+            inventory_data = df.groupby('Date', sort=True).agg(
+                **{'Inventory Level': ('Inventory Level', 'mean'), 'Units Sold': ('Units Sold', 'sum')}
+            )
             
             # Calculate inventory turn rate
-            sales_data = df.groupby('Date')['Units Sold'].sum().reset_index()
-            inventory_data['Inventory Turn Rate'] = sales_data['Units Sold'] / inventory_data['Inventory Level']
+            inventory_data['Inventory Turn Rate'] = inventory_data.pop('Units Sold') / inventory_data['Inventory Level']
             
-            return {"inventory": inventory_data.to_dict('records')}
+            inventory_data = inventory_data.reset_index()
+            inventory_data['Date'] = inventory_data['Date'].dt.strftime('%Y-%m-%d')
+            
+            return ORJSONResponse({"inventory": inventory_data.to_dict('records')}, headers={"ETag": etag})
         else:
-            return {"inventory": []}
+            return ORJSONResponse({"inventory": []}, headers={"ETag": etag})
     
     except Exception as e:
         logger.error(f"Error retrieving inventory analytics: {str(e)}")
@@ -437,22 +617,16 @@ async def get_feature_importance(product_id: str, store_id: str):
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/api/settings")
-async def get_settings():
+async def get_settings(request: Request):
     """
     Get current system settings
     """
     try:
-        settings = {
-            "lead_time": 7,
-            "safety_stock_factor": 1.5,
-            "forecast_days": 30,
-            "ordering_cost": 25.0,
-            "holding_cost_percentage": 0.25,
-            "prophet_weight": 0.6,
-            "notification_email": None
-        }
-        
-        return {"settings": settings}
+        etag = f'"{settings_etag}"'
+        if is_not_modified(request, etag):
+            return Response(status_code=304, headers={"ETag": etag})
+        
+        return Response(content=settings_response_body, media_type="application/json", headers={"ETag": etag})
     
     except Exception as e:
         logger.error(f"Error retrieving settings: {str(e)}")
@@ -463,14 +637,22 @@ async def update_settings(settings: Settings):
     """
     Update system settings
     """
+    global settings_response_body, settings_etag
+    
     try:
         # In a real implementation, you would save these settings
         # to a database or configuration file
         
         # Update inventory optimizer settings
         if inventory_optimizer:
-            inventory_optimizer.lead_time = settings.lead_time
-            inventory_optimizer.safety_stock_factor = settings.safety_stock_factor
+            inventory_optimizer.update_settings(
+                lead_time=settings.lead_time,
+                safety_stock_factor=settings.safety_stock_factor
+            )
+        
+        # Serve the new values from GET /api/settings
+        settings_response_body = orjson.dumps({"settings": settings.model_dump()})
+        settings_etag = hashlib.md5(settings_response_body).hexdigest()
         
         return {"message": "Settings updated successfully"}
     
@@ -479,25 +661,29 @@ async def update_settings(settings: Settings):
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/api/external/weather")
-async def get_weather(city: str = "New York"):
+def get_weather(response: Response, city: str = "New York"):
     """
     Get weather data for a specific city
     """
     try:
-        weather_data = weather_api.get_weather(city)
-        return {"weather": weather_data}
+        weather_data = get_weather_api().get_weather_forecast(city)
+        # Matches the forecast's freshness in WeatherAPI; an empty forecast is the
+        # error fallback and must not be cached downstream
+        if len(weather_data):
+            response.headers["Cache-Control"] = "public, max-age=600"
+        return {"weather": weather_data.to_records()}
     
     except Exception as e:
         logger.error(f"Error retrieving weather data: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/api/external/social-trends")
-async def get_social_trends(product: str):
+def get_social_trends(product: str):
     """
     Get social media trends for a specific product
     """
     try:
-        trends = twitter_api.get_product_trends(product)
+        trends = get_external_analyzer().analyze_social_trends(product)
         return {"trends": trends}
     
     except Exception as e:
@@ -506,4 +692,13 @@ async def get_social_trends(product: str):
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
+    # Settings and the forecast cache are per process, so one worker unless WEB_CONCURRENCY says otherwise
+    uvicorn.run(
+        "main:app",
+        host="0.0.0.0",
+        port=8000,
+        loop="auto",  # uvloop when installed, asyncio otherwise (e.g. on Windows)
+        http="httptools",
+        workers=int(os.getenv("WEB_CONCURRENCY", "1")),
+        log_level="warning"
+    )
\ No newline at end of file
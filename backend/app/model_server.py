@@ -0,0 +1,124 @@
+import os
+import logging
+from multiprocessing.managers import BaseManager
+from typing import Any, Dict, Optional, Tuple
+from rag_pipeline import RetailRAGPipeline
+from models.forecasting import ProphetForecaster, LSTMForecaster, EnsembleForecaster
+from models.inventory import InventoryOptimizer
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+DATA_PATH = "data/store_S004_inventory.csv"
+COMPONENT_NAMES = ["rag_pipeline", "forecaster", "lstm_forecaster", "ensemble_forecaster", "inventory_optimizer"]
+
+# Methods each component serves to API workers. Forecasters serve forecast(), which trains
+# and predicts under the forecaster's lock in this process, so workers can't interleave
+# each other's series; train() is not served since it would send the fitted model back
+FORECASTER_METHODS = ("forecast",)
+EXPOSED_METHODS = {
+    "rag_pipeline": ("query",),
+    "forecaster": FORECASTER_METHODS,
+    "lstm_forecaster": FORECASTER_METHODS,
+    "ensemble_forecaster": FORECASTER_METHODS,
+    "inventory_optimizer": ("get_recommendations", "get_inventory_health", "refresh", "update_settings")
+}
+
+# Components owned by the model server process
+_components: Dict[str, Any] = {}
+
+
+class ModelManager(BaseManager):
+    """Manager exposing the heavy RAG and forecasting components over IPC"""
+
+
+def build_components(data_path: str = DATA_PATH) -> Dict[str, Any]:
+    """
+    Construct the RAG pipeline, forecasters and inventory optimizer
+
+    Args:
+        data_path (str): Path to the retail data CSV file
+
+    Returns:
+        Dict[str, Any]: Components keyed by their name in main.py
+    """
+    logger.info("Initializing RAG pipeline...")
+    rag_pipeline = RetailRAGPipeline(data_path)
+    rag_pipeline.initialize_pipeline()
+
+    logger.info("Initializing forecasting models...")
+    ensemble_forecaster = EnsembleForecaster(data_path, lookback=30)
+
+    return {
+        "rag_pipeline": rag_pipeline,
+        "forecaster": ProphetForecaster(data_path),
+        "lstm_forecaster": LSTMForecaster(data_path, lookback=30),
+        "ensemble_forecaster": ensemble_forecaster,
+        "inventory_optimizer": InventoryOptimizer(ensemble_forecaster)
+    }
+
+
+def parse_address(address: str) -> Tuple[str, int]:
+    """
+    Parse a "host:port" model server address
+
+    Args:
+        address (str): Address in "host:port" form
+
+    Returns:
+        Tuple[str, int]: Host and port
+    """
+    host, _, port = address.rpartition(":")
+    return host or "127.0.0.1", int(port)
+
+
+def connect(address: str, authkey: Optional[bytes] = None) -> Dict[str, Any]:
+    """
+    Connect to a running model server and return proxies for its components
+
+    Args:
+        address (str): Model server address in "host:port" form
+        authkey (bytes, optional): Shared secret, defaults to MODEL_SERVER_AUTHKEY
+
+    Returns:
+        Dict[str, Any]: Component proxies keyed by name
+    """
+    if authkey is None:
+        authkey = os.getenv("MODEL_SERVER_AUTHKEY", "").encode()
+
+    for name in COMPONENT_NAMES:
+        ModelManager.register(name)
+
+    manager = ModelManager(address=parse_address(address), authkey=authkey)
+    manager.connect()
+    logger.info(f"Connected to model server at {address}")
+
+    return {name: getattr(manager, name)() for name in COMPONENT_NAMES}
+
+
+def serve(address: str, authkey: bytes, data_path: str = DATA_PATH) -> None:
+    """
+    Build the components once and serve them to API workers until interrupted
+
+    Args:
+        address (str): Address to listen on in "host:port" form
+        authkey (bytes): Shared secret clients must present
+        data_path (str): Path to the retail data CSV file
+    """
+    _components.update(build_components(data_path))
+
+    for name in COMPONENT_NAMES:
+        ModelManager.register(name, callable=lambda name=name: _components[name], exposed=EXPOSED_METHODS[name])
+
+    manager = ModelManager(address=parse_address(address), authkey=authkey)
+    server = manager.get_server()
+    logger.info(f"Model server listening on {address}")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    serve(
+        os.getenv("MODEL_SERVER_ADDRESS", "127.0.0.1:50000"),
+        os.getenv("MODEL_SERVER_AUTHKEY", "").encode()
+    )
@@ -1,28 +1,302 @@
 import pandas as pd
 import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+import pyarrow as pa
+import pyarrow.csv as pv
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
 from prophet import Prophet
+from prophet.serialize import model_from_json, model_to_json
 from typing import Dict, Any, List, Tuple, Optional
 import tensorflow as tf
 from tensorflow.keras.models import Sequential
 from tensorflow.keras.layers import LSTM, Dense, Dropout
-from sklearn.preprocessing import MinMaxScaler
+from joblib import Parallel, delayed
 import logging
+import glob
+import hashlib
+from functools import lru_cache
+import os
+import pickle
+import shutil
+import tempfile
+import threading
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Mixed precision for the LSTM: float16 on GPU by default, or set
+# LSTM_PRECISION_POLICY (e.g. "mixed_bfloat16" on CPUs with AVX-512 BF16).
+# Applied to the LSTM's own layers only, never as the process-wide Keras policy
+LSTM_PRECISION_POLICY = os.getenv(
+    "LSTM_PRECISION_POLICY",
+    "mixed_float16" if tf.config.list_physical_devices("GPU") else "float32"
+)
+
+# Columns each model reads from the retail data (missing ones are skipped)
+PROPHET_COLUMNS = ['Date', 'Product ID', 'Store ID', 'Units Sold', 'Price', 'Discount',
+                   'Holiday/Promotion', 'Is_Summer', 'Is_Winter']
+LSTM_COLUMNS = ['Date', 'Product ID', 'Store ID', 'Units Sold', 'Price', 'Discount', 'Inventory Level',
+                'Units_Sold_Lag7', 'Inventory_to_Sales', 'Weather Condition', 'Is_Spring', 'Is_Summer',
+                'Is_Monsoon', 'Is_Autumn', 'Is_Pre-winter', 'Is_Winter', 'Holiday/Promotion']
+# Fractional columns stored as float32; counts keep their integer type
+FLOAT_COLUMNS = {'Price', 'Discount', 'Units_Sold_Lag7', 'Inventory_to_Sales'}
+
+# Known weather conditions; one-hot rows indexed by category code, with the
+# trailing zero row picked up by code -1 (unknown or missing weather)
+WEATHERS = ('Cloudy', 'Rainy', 'Snowy', 'Sunny')
+_WEATHER_ONEHOT = np.vstack([np.eye(len(WEATHERS), dtype=np.float32),
+                             np.zeros((1, len(WEATHERS)), dtype=np.float32)])
+
+
+PARTITION_COLUMNS = ['Product ID', 'Store ID']
+
+# Directory for trained models, reused across restarts and workers
+MODEL_CACHE_DIR = os.getenv("MODEL_CACHE_DIR", os.path.join(tempfile.gettempdir(), "brainy_fools_models"))
+
+_dataset_lock = threading.Lock()
+
+
+def ensure_parquet(csv_path: str) -> str:
+    """
+    Convert the CSV into a Parquet dataset partitioned by (Product ID, Store ID)
+    
+    Each version of the CSV (by modification time) gets its own dataset directory.
+    It is written to a unique staging directory and renamed into place, so readers
+    never see a partial dataset; when another process wins the race to build the
+    same version, its copy is kept and ours is discarded.
+    
+    Args:
+        csv_path (str): Path to the retail data CSV file
+        
+    Returns:
+        str: Root directory of the Parquet dataset
+    """
+    root = f"{csv_path}.{os.stat(csv_path).st_mtime_ns}.parquet"
+    
+    with _dataset_lock:
+        if os.path.isdir(root):
+            return root
+        
+        logger.info(f"Building partitioned Parquet dataset for {csv_path}")
+        header = pd.read_csv(csv_path, nrows=0).columns
+        df = pv.read_csv(csv_path, convert_options=pv.ConvertOptions(
+            column_types={c: pa.float32() for c in header if c in FLOAT_COLUMNS}
+        )).to_pandas()
+        
+        # Day-first dates are left as strings by pyarrow; ISO dates arrive already parsed
+        df['Date'] = pd.to_datetime(df['Date'], dayfirst=True)
+        
+        staging_root = tempfile.mkdtemp(prefix='.parquet-', dir=os.path.dirname(csv_path) or '.')
+        try:
+            pq.write_to_dataset(
+                pa.Table.from_pandas(df, preserve_index=False),
+                staging_root,
+                partition_cols=[c for c in PARTITION_COLUMNS if c in df.columns] or None
+            )
+            os.rename(staging_root, root)
+        except OSError:
+            # Another process renamed its copy of this version into place first
+            if not os.path.isdir(root):
+                raise
+        finally:
+            shutil.rmtree(staging_root, ignore_errors=True)
+        
+        # Datasets of earlier versions of the CSV are no longer read
+        for stale in glob.glob(f"{glob.escape(csv_path)}.*.parquet"):
+            if stale != root:
+                shutil.rmtree(stale, ignore_errors=True)
+        return root
+
+
+def model_cache_path(kind: str, data_path: str, *key_parts: Any, suffix: str = ".pkl") -> str:
+    """
+    Path of a cached trained model, keyed by the data file version and training inputs
+    
+    Args:
+        kind (str): Model kind, used as the file name prefix
+        data_path (str): Path to the retail data CSV file
+        *key_parts: Training data digest and any settings that change the fitted model
+        suffix (str): File extension for the saved model
+        
+    Returns:
+        str: Cache file path
+    """
+    key = "|".join(map(str, (os.path.abspath(data_path), os.path.getmtime(data_path)) + key_parts))
+    digest = hashlib.blake2b(key.encode(), digest_size=16).hexdigest()
+    os.makedirs(MODEL_CACHE_DIR, exist_ok=True)
+    return os.path.join(MODEL_CACHE_DIR, f"{kind}_{digest}{suffix}")
+
+
+def _staging_path(cache_path: str) -> str:
+    """
+    Per-thread file a cached model is written to before being renamed into place
+    
+    The extension is kept, since Keras picks the save format from it.
+    """
+    root, ext = os.path.splitext(cache_path)
+    return f"{root}.{os.getpid()}-{threading.get_ident()}.tmp{ext}"
+
+
+def frame_digest(df: pd.DataFrame) -> str:
+    """
+    Content hash of a training frame, so cached models follow the data they were fit on
+    
+    Args:
+        df (pd.DataFrame): Training data
+        
+    Returns:
+        str: Hex digest of the frame's values and index
+    """
+    hashed = pd.util.hash_pandas_object(df, index=True).to_numpy()
+    return hashlib.blake2b(hashed.tobytes(), digest_size=16).hexdigest()
+
+
+@lru_cache(maxsize=4)
+def _load_indexed(root: str, mtime: float, columns: Tuple[str, ...]) -> pd.DataFrame:
+    """
+    Load columns of the Parquet dataset under a sorted (Product ID, Store ID, Date) index
+    
+    Cached per dataset version and column set, so filtering one series is an
+    index lookup instead of two full-column comparisons.
+    """
+    dataset = ds.dataset(root, format='parquet', partitioning='hive')
+    usecols = [c for c in columns if c in dataset.schema.names]
+    
+    df = dataset.to_table(columns=usecols).to_pandas(split_blocks=True, self_destruct=True)
+    
+    keys = [c for c in PARTITION_COLUMNS if c in df.columns]
+    return df.set_index(keys + ['Date']).sort_index()
+
+
+def read_retail_data(path: str, columns: List[str], product_id: Optional[str] = None,
+                     store_id: Optional[str] = None, latest_only: bool = False) -> pd.DataFrame:
+    """
+    Read selected columns of the retail data from its partitioned Parquet copy
+    
+    The returned frame is a fresh copy that callers may modify.
+    
+    Args:
+        path (str): Path to the retail data CSV file
+        columns (List[str]): Columns to read; those not in the file are skipped
+        product_id (str, optional): Only keep rows for this product (requires store_id)
+        store_id (str, optional): Only keep rows for this store (requires product_id)
+        latest_only (bool): Only keep rows from the most recent date in the selection
+        
+    Returns:
+        pd.DataFrame: The requested columns with 'Date' parsed, in date order per series
+    """
+    root = ensure_parquet(path)
+    indexed = _load_indexed(root, os.path.getmtime(root), tuple(columns))
+    
+    if product_id and store_id:
+        for column in PARTITION_COLUMNS:
+            if column not in indexed.index.names:
+                raise KeyError(column)
+        
+        try:
+            indexed = indexed.loc[(product_id, store_id, slice(None)), :]
+        except KeyError:
+            indexed = indexed.iloc[0:0]
+    
+    # Select on the index before copying so only the matching rows are materialized
+    if latest_only and len(indexed):
+        dates = indexed.index.get_level_values('Date').values
+        if product_id and store_id:
+            # A single series is already in date order, so its latest rows are the tail
+            indexed = indexed.iloc[np.searchsorted(dates, dates[-1]):]
+        else:
+            indexed = indexed[dates == dates.max()]
+    
+    return indexed.reset_index()
+
+
 class ProphetForecaster:
-    def __init__(self, data_path: str):
+    def __init__(self, data_path: str, uncertainty_samples: int = 100,
+                 yearly_seasonality: Any = True, weekly_seasonality: Any = True,
+                 daily_seasonality: Any = False, seasonality_mode: str = 'additive',
+                 mcmc_samples: int = 0):
         """
         Initialize the Prophet forecaster.
         
         Args:
             data_path (str): Path to the retail data CSV file
+            uncertainty_samples (int): Draws used for the forecast intervals (Prophet's default is 1000)
+            yearly_seasonality: Yearly seasonality switch or Fourier order
+            weekly_seasonality: Weekly seasonality switch or Fourier order
+            daily_seasonality: Daily seasonality switch or Fourier order (off for daily data)
+            seasonality_mode (str): 'additive' or 'multiplicative'
+            mcmc_samples (int): MCMC samples; 0 uses MAP estimation
         """
         self.data_path = data_path
         self.model = None
         self.data = None
+        self._data_key = None
+        self._last_periods = None
+        self._last_forecast = None
+        # Held from train to predict by forecast(), so concurrent callers can't swap the series in between
+        self.lock = threading.Lock()
+        self.prophet_params = {
+            'uncertainty_samples': uncertainty_samples,
+            'yearly_seasonality': yearly_seasonality,
+            'weekly_seasonality': weekly_seasonality,
+            'daily_seasonality': daily_seasonality,
+            'seasonality_mode': seasonality_mode,
+            'mcmc_samples': mcmc_samples
+        }
+        
+    def __getstate__(self) -> Dict[str, Any]:
+        # Locks can't be pickled; train_many ships fitted forecasters between processes
+        state = self.__dict__.copy()
+        del state['lock']
+        return state
+    
+    def __setstate__(self, state: Dict[str, Any]):
+        self.__dict__.update(state)
+        self.lock = threading.Lock()
+    
+    def forecast(self, product_id: Optional[str] = None, store_id: Optional[str] = None,
+                 periods: int = 30) -> pd.DataFrame:
+        """
+        Train on a product/store and forecast it as one step
+        
+        Args:
+            product_id (str, optional): Filter data for a specific product
+            store_id (str, optional): Filter data for a specific store
+            periods (int): Number of days to forecast
+            
+        Returns:
+            pd.DataFrame: Forecast results
+        """
+        with self.lock:
+            self.train(product_id, store_id)
+            return self.predict(periods)
+    
+    @classmethod
+    def train_many(cls, data_path: str, pairs: List[Tuple[str, str]],
+                   n_jobs: int = -1, **prophet_params) -> Dict[Tuple[str, str], "ProphetForecaster"]:
+        """
+        Train one Prophet model per (product, store) pair in parallel worker processes
+        
+        Args:
+            data_path (str): Path to the retail data CSV file
+            pairs (List[Tuple[str, str]]): (Product ID, Store ID) pairs to train
+            n_jobs (int): Number of worker processes (-1 uses all cores)
+            **prophet_params: Constructor arguments forwarded to each forecaster
+            
+        Returns:
+            Dict[Tuple[str, str], ProphetForecaster]: Trained forecasters keyed by pair
+        """
+        # Build the partitioned dataset once so the workers don't race to create it
+        ensure_parquet(data_path)
+        
+        logger.info(f"Training {len(pairs)} Prophet models with n_jobs={n_jobs}")
+        fitted = Parallel(n_jobs=n_jobs, backend='loky')(
+            delayed(_fit_one)(data_path, product_id, store_id, prophet_params) for product_id, store_id in pairs
+        )
         
+        return {pair: pickle.loads(payload) for pair, payload in zip(pairs, fitted)}
+    
     def load_and_preprocess_data(self, product_id: Optional[str] = None, store_id: Optional[str] = None):
         """
         Load and preprocess the retail data for forecasting
@@ -32,19 +306,15 @@ class ProphetForecaster:
             store_id (str, optional): Filter data for a specific store
         """
         logger.info(f"Loading data from {self.data_path}")
-        df = pd.read_csv(self.data_path)
-        
-        # Convert Date column to datetime
-        df['Date'] = pd.to_datetime(df['Date'])
         
-        # Filter data if product_id and store_id are provided
+        # Filter data while reading if product_id and store_id are provided
         if product_id and store_id:
             logger.info(f"Filtering data for Product ID: {product_id}, Store ID: {store_id}")
-            df = df[(df['Product ID'] == product_id) & (df['Store ID'] == store_id)]
-            
-            if df.empty:
-                logger.warning(f"No data found for Product ID: {product_id}, Store ID: {store_id}")
-                return None
+        df = read_retail_data(self.data_path, PROPHET_COLUMNS, product_id, store_id)
+        
+        if product_id and store_id and df.empty:
+            logger.warning(f"No data found for Product ID: {product_id}, Store ID: {store_id}")
+            return None
         
         # Prepare data for Prophet (requires 'ds' and 'y' columns)
         prophet_data = df[['Date', 'Units Sold']].rename(columns={'Date': 'ds', 'Units Sold': 'y'})
@@ -55,7 +325,18 @@ class ProphetForecaster:
             if regressor in df.columns:
                 prophet_data[regressor] = df[regressor]
         
+        # Several series share each date when not filtering: aggregate to one row per day
+        if prophet_data['ds'].duplicated().any():
+            aggregations = {column: 'mean' for column in prophet_data.columns if column not in ('ds', 'y')}
+            aggregations['y'] = 'sum'
+            prophet_data = prophet_data.groupby('ds', sort=False, as_index=False, observed=True).agg(aggregations)
+            
+            # Rows usually arrive in date order already; only sort when they don't
+            if not prophet_data['ds'].is_monotonic_increasing:
+                prophet_data = prophet_data.sort_values('ds', ignore_index=True)
+        
         self.data = prophet_data
+        self._last_periods = self._last_forecast = None
         logger.info(f"Data loaded successfully. Shape: {prophet_data.shape}")
         return prophet_data
     
@@ -67,19 +348,32 @@ class ProphetForecaster:
             product_id (str, optional): Filter data for a specific product
             store_id (str, optional): Filter data for a specific store
         """
-        if self.data is None:
+        # Reload whenever the requested series changes so the model is fit on it
+        if self.data is None or self._data_key != (product_id, store_id):
             self.data = self.load_and_preprocess_data(product_id, store_id)
+            self._data_key = (product_id, store_id)
             
         if self.data is None or self.data.empty:
             logger.error("No data available for training")
             return None
+        
+        self._last_periods = self._last_forecast = None
             
+        # Saved with Prophet's JSON serializer, which unlike pickle is stable across versions
+        cache_path = model_cache_path("prophet", self.data_path, frame_digest(self.data),
+                                      sorted(self.prophet_params.items()), suffix=".json")
+        if os.path.exists(cache_path):
+            logger.info(f"Loading cached Prophet model from {cache_path}")
+            try:
+                with open(cache_path) as f:
+                    self.model = model_from_json(f.read())
+                self._prepare_regressors()
+                return self.model
+            except Exception as e:
+                logger.warning(f"Could not load cached Prophet model, retraining: {str(e)}")
+        
         logger.info("Training Prophet model")
-        self.model = Prophet(
-            yearly_seasonality=True,
-            weekly_seasonality=True,
-            daily_seasonality=False
-        )
+        self.model = Prophet(**self.prophet_params)
         
         # Add regressors
         for column in self.data.columns:
@@ -87,9 +381,28 @@ class ProphetForecaster:
                 self.model.add_regressor(column)
         
         self.model.fit(self.data)
+        self._prepare_regressors()
         logger.info("Prophet model trained successfully")
+        
+        staging_path = _staging_path(cache_path)
+        try:
+            with open(staging_path, 'w') as f:
+                f.write(model_to_json(self.model))
+            os.replace(staging_path, cache_path)
+        except Exception as e:
+            logger.warning(f"Could not cache Prophet model: {str(e)}")
+            if os.path.exists(staging_path):
+                os.remove(staging_path)
+        
         return self.model
     
+    def _prepare_regressors(self):
+        """Precompute the regressor history by date and the means used for future dates"""
+        self._regressor_columns = [c for c in self.data.columns if c not in ('ds', 'y')]
+        regressors = self.data.set_index('ds')[self._regressor_columns]
+        self._regressor_history = regressors[~regressors.index.duplicated()]
+        self._regressor_means = regressors.mean().to_dict()
+    
     def predict(self, periods: int = 30) -> pd.DataFrame:
         """
         Generate forecasts for the specified number of periods
@@ -103,16 +416,46 @@ class ProphetForecaster:
         if self.model is None:
             logger.warning("Model not trained. Training now.")
             self.train()
+        
+        # Reuse the last forecast until the model or data changes
+        if self._last_periods == periods:
+            return self._last_forecast
             
         logger.info(f"Generating forecast for {periods} periods")
         future = self.model.make_future_dataframe(periods=periods)
         
-        # Add regressor values for future dates
-        for column in self.data.columns:
-            if column not in ['ds', 'y']:
-                if column in future.columns:
-                    # Use mean of historical values for future dates
-                    future.loc[future['ds'] > self.data['ds'].max(), column] = self.data[column].mean()
+        # Add regressor values: historical values where known, their mean for future dates
+        if self._regressor_columns:
+            regressors = self._regressor_history.reindex(future['ds']).fillna(self._regressor_means)
+            future[self._regressor_columns] = regressors.to_numpy()
+        
+        forecast = self.model.predict(future)
+        logger.info("Forecast generated successfully")
+        
+        self._last_periods, self._last_forecast = periods, forecast
+        return forecast
+    
+    def predict_future_only(self, periods: int = 30) -> pd.DataFrame:
+        """
+        Generate forecasts for the future dates only, skipping the in-sample fit
+        
+        Args:
+            periods (int): Number of days to forecast
+            
+        Returns:
+            pd.DataFrame: Forecast results for the `periods` days after the training data
+        """
+        if self.model is None:
+            logger.warning("Model not trained. Training now.")
+            self.train()
+            
+        logger.info(f"Generating future-only forecast for {periods} periods")
+        last_date = self.model.history['ds'].max()
+        future = pd.DataFrame({'ds': pd.date_range(last_date + pd.Timedelta(days=1), periods=periods, freq='D')})
+        
+        # Future regressor values are the historical means
+        for column in self._regressor_columns:
+            future[column] = self._regressor_means[column]
         
         forecast = self.model.predict(future)
         logger.info("Forecast generated successfully")
@@ -124,7 +467,8 @@ class ProphetForecaster:
         Get the components of the forecast (trend, seasonality, etc.)
         
         Returns:
-            Dict[str, Any]: Forecast components
+            Dict[str, Any]: Forecast components as columns: 'ds' holds ISO dates and
+                each component holds a float array aligned with it
         """
         if self.model is None:
             logger.warning("Model not trained. Training now.")
@@ -132,23 +476,61 @@ class ProphetForecaster:
             
         forecast = self.predict()
         
-        components = {
-            'trend': forecast[['ds', 'trend']].to_dict('records'),
-            'yhat': forecast[['ds', 'yhat']].to_dict('records'),
-            'yhat_lower': forecast[['ds', 'yhat_lower']].to_dict('records'),
-            'yhat_upper': forecast[['ds', 'yhat_upper']].to_dict('records')
-        }
+        components = {'ds': forecast['ds'].dt.strftime('%Y-%m-%d').tolist()}
+        for column in ['trend', 'yhat', 'yhat_lower', 'yhat_upper']:
+            components[column] = forecast[column].to_numpy()
         
         # Add weekly and yearly seasonality if they exist
-        if 'weekly' in forecast.columns:
-            components['weekly'] = forecast[['ds', 'weekly']].to_dict('records')
-        if 'yearly' in forecast.columns:
-            components['yearly'] = forecast[['ds', 'yearly']].to_dict('records')
+        for column in ['weekly', 'yearly']:
+            if column in forecast.columns:
+                components[column] = forecast[column].to_numpy()
         
         return components
 
 
-def create_sequences(data: pd.DataFrame, features: List[str], lookback: int) -> Tuple[np.ndarray, np.ndarray]:
+def _fit_one(data_path: str, product_id: str, store_id: str, prophet_params: Dict[str, Any]) -> bytes:
+    """
+    Train a Prophet forecaster for one (product, store) pair in a worker process
+    
+    Returns:
+        bytes: The pickled forecaster, with its model and training data
+    """
+    forecaster = ProphetForecaster(data_path, **prophet_params)
+    forecaster.train(product_id, store_id)
+    return pickle.dumps(forecaster)
+
+
+def fill_missing(data: np.ndarray) -> np.ndarray:
+    """
+    Forward-fill then backward-fill NaNs down each column, in place
+    
+    Args:
+        data (np.ndarray): 2D float array (rows are time steps)
+        
+    Returns:
+        np.ndarray: The same array, filled
+    """
+    missing = np.isnan(data)
+    if not missing.any():
+        return data
+    
+    rows = np.arange(len(data))[:, None]
+    columns = np.arange(data.shape[1])
+    
+    # Forward fill: index of the last valid row at or before each row
+    last_valid = np.where(missing, 0, rows)
+    np.maximum.accumulate(last_valid, axis=0, out=last_valid)
+    data[:] = data[last_valid, columns]
+    
+    # Backward fill the leading gaps with each column's first valid value
+    first_valid = data[(~missing).argmax(axis=0), columns]
+    np.copyto(data, np.broadcast_to(first_valid, data.shape), where=np.isnan(data))
+    
+    return data
+
+
+def create_sequences(data: pd.DataFrame, features: List[str], lookback: int,
+                     horizon: int = 1) -> Tuple[np.ndarray, np.ndarray]:
     """
     Create sequences for LSTM model
     
@@ -156,35 +538,91 @@ def create_sequences(data: pd.DataFrame, features: List[str], lookback: int) ->
         data (pd.DataFrame): Input dataframe
         features (List[str]): List of feature columns
         lookback (int): Number of time steps to look back
+        horizon (int): Number of future steps each sample predicts
         
     Returns:
-        Tuple[np.ndarray, np.ndarray]: X and y arrays for LSTM model
+        Tuple[np.ndarray, np.ndarray]: X of shape (n, lookback, features) and y of shape (n, horizon)
     """
-    X, y = [], []
-    data_array = data[features].values
+    data_array = data[features].to_numpy(dtype=np.float32)
+    n_samples = len(data_array) - lookback - horizon + 1
+    
+    if n_samples <= 0:
+        return (np.empty((0, lookback, len(features)), dtype=np.float32),
+                np.empty((0, horizon), dtype=np.float32))
     
-    for i in range(len(data_array) - lookback):
-        X.append(data_array[i:i+lookback])
-        y.append(data_array[i+lookback, 0])  # First column is 'Units Sold'
+    # Zero-copy views of every input window and the 'Units Sold' values that follow it
+    X = sliding_window_view(data_array, window_shape=lookback, axis=0).transpose(0, 2, 1)[:n_samples]
+    y = sliding_window_view(data_array[lookback:, 0], window_shape=horizon)[:n_samples].copy()
     
-    return np.array(X), np.array(y)
+    return X, y
+
+
+class MinMaxScaler:
+    """Per-column min-max scaling to [0, 1] for dense float arrays, done in place"""
+    
+    def __init__(self):
+        self.data_min = None
+        self.data_range = None
+    
+    def fit_transform(self, data: np.ndarray) -> np.ndarray:
+        """
+        Fit the column minimums and ranges, then scale the array in place
+        
+        Args:
+            data (np.ndarray): 2D float array to scale
+            
+        Returns:
+            np.ndarray: The same array, scaled
+        """
+        self.data_min = data.min(axis=0)
+        data_range = data.max(axis=0) - self.data_min
+        
+        # Constant columns keep a range of 1 so they scale to 0, as in scikit-learn
+        self.data_range = np.where(data_range > 0, data_range, 1).astype(data.dtype)
+        
+        np.subtract(data, self.data_min, out=data)
+        np.divide(data, self.data_range, out=data)
+        return data
+    
+    def inverse_transform_column(self, values: np.ndarray, column: int) -> np.ndarray:
+        """
+        Map scaled values of a single column back to the original units
+        
+        Args:
+            values (np.ndarray): Scaled values of the column
+            column (int): Position of the column in the fitted data
+            
+        Returns:
+            np.ndarray: Values in the original units
+        """
+        return values * self.data_range[column] + self.data_min[column]
 
 
 class LSTMForecaster:
-    def __init__(self, data_path: str, lookback: int = 30):
+    def __init__(self, data_path: str, lookback: int = 30, horizon: int = 30):
         """
         Initialize the LSTM forecaster.
         
         Args:
             data_path (str): Path to the retail data CSV file
             lookback (int): Number of time steps to look back
+            horizon (int): Number of days predicted by a single forward pass; lowered
+                for series shorter than lookback + horizon days, so any series with at
+                least lookback + 1 days can be trained on
         """
         self.data_path = data_path
         self.lookback = lookback
+        self.horizon = horizon
+        # Horizon of the fitted model: `horizon`, or less for a short series
+        self.model_horizon = horizon
         self.model = None
         self.data = None
+        self._data_key = None
         self.scaler = MinMaxScaler()
         self.features = None
+        self._predict_step = None
+        # Held from train to predict by forecast(), so concurrent callers can't swap the series in between
+        self.lock = threading.Lock()
         
     def load_and_preprocess_data(self, product_id: Optional[str] = None, store_id: Optional[str] = None):
         """
@@ -195,19 +633,15 @@ class LSTMForecaster:
             store_id (str, optional): Filter data for a specific store
         """
         logger.info(f"Loading data from {self.data_path}")
-        df = pd.read_csv(self.data_path)
-        
-        # Convert Date column to datetime
-        df['Date'] = pd.to_datetime(df['Date'])
         
-        # Filter data if product_id and store_id are provided
+        # Filter data while reading if product_id and store_id are provided
         if product_id and store_id:
             logger.info(f"Filtering data for Product ID: {product_id}, Store ID: {store_id}")
-            df = df[(df['Product ID'] == product_id) & (df['Store ID'] == store_id)]
-            
-            if df.empty:
-                logger.warning(f"No data found for Product ID: {product_id}, Store ID: {store_id}")
-                return None
+        df = read_retail_data(self.data_path, LSTM_COLUMNS, product_id, store_id)
+        
+        if product_id and store_id and df.empty:
+            logger.warning(f"No data found for Product ID: {product_id}, Store ID: {store_id}")
+            return None
         
         # Sort by date
         df = df.sort_values('Date')
@@ -218,9 +652,12 @@ class LSTMForecaster:
         
         # Add one-hot encoding for weather condition if it exists
         if 'Weather Condition' in df.columns:
-            weather_dummies = pd.get_dummies(df['Weather Condition'], prefix='Weather')
-            df = pd.concat([df, weather_dummies], axis=1)
-            weather_columns = weather_dummies.columns.tolist()
+            # Fixed category order keeps the feature count the same for every product/store
+            codes = pd.Categorical(df['Weather Condition'], categories=WEATHERS).codes
+            weather_onehot = _WEATHER_ONEHOT[codes]
+            weather_columns = [f'Weather_{weather}' for weather in WEATHERS]
+            for i, column in enumerate(weather_columns):
+                df[column] = weather_onehot[:, i]
             self.features.extend(weather_columns)
         
         # Add season indicators if they exist
@@ -242,10 +679,10 @@ class LSTMForecaster:
         self.features = available_features
         
         # Create a dataset with only selected features
-        data_subset = df[self.features].copy()
+        data_subset = df[self.features].to_numpy(dtype=np.float32, copy=True)
         
         # Handle missing values
-        data_subset = data_subset.fillna(method='ffill').fillna(method='bfill')
+        fill_missing(data_subset)
         
         # Scale the data
         scaled_data = self.scaler.fit_transform(data_subset)
@@ -254,6 +691,23 @@ class LSTMForecaster:
         logger.info(f"Data loaded successfully. Shape: {self.data.shape}")
         return self.data
     
+    def forecast(self, product_id: Optional[str] = None, store_id: Optional[str] = None,
+                 periods: int = 30) -> np.ndarray:
+        """
+        Train on a product/store and forecast it as one step
+        
+        Args:
+            product_id (str, optional): Filter data for a specific product
+            store_id (str, optional): Filter data for a specific store
+            periods (int): Number of days to forecast
+            
+        Returns:
+            np.ndarray: Forecasted values
+        """
+        with self.lock:
+            self.train(product_id, store_id)
+            return self.predict(periods)
+    
     def train(self, product_id: Optional[str] = None, store_id: Optional[str] = None, epochs: int = 50, batch_size: int = 32):
         """
         Train the LSTM model
@@ -267,50 +721,103 @@ class LSTMForecaster:
         Returns:
             tf.keras.Model: Trained LSTM model
         """
-        if self.data is None:
+        # Reload whenever the requested series changes so the model is fit on it
+        if self.data is None or self._data_key != (product_id, store_id):
             self.data = self.load_and_preprocess_data(product_id, store_id)
+            self._data_key = (product_id, store_id)
             
         if self.data is None or self.data.empty:
             logger.error("No data available for training")
             return None
         
-        logger.info("Creating sequences for LSTM")
-        X, y = create_sequences(self.data, self.features, self.lookback)
-        
-        if len(X) == 0:
-            logger.error("Not enough data points to create sequences")
+        # A series too short for the full horizon is fit with a shorter one
+        self.model_horizon = min(self.horizon, len(self.data) - self.lookback)
+        if self.model_horizon < 1:
+            logger.error(f"Not enough data points to create sequences: {len(self.data)} rows, "
+                         f"need at least {self.lookback + 1}")
             return None
+        if self.model_horizon < self.horizon:
+            logger.info(f"Series has {len(self.data)} rows; using a {self.model_horizon}-day horizon")
+        
+        logger.info("Creating sequences for LSTM")
+        X, y = create_sequences(self.data, self.features, self.lookback, self.model_horizon)
         
         # Split data into train and validation sets
         train_size = int(0.8 * len(X))
         X_train, X_val = X[:train_size], X[train_size:]
         y_train, y_val = y[:train_size], y[train_size:]
         
+        cache_path = model_cache_path("lstm", self.data_path, frame_digest(self.data), self.lookback,
+                                      self.model_horizon, self.features, epochs, batch_size, suffix=".keras")
+        if os.path.exists(cache_path):
+            logger.info(f"Loading cached LSTM model from {cache_path}")
+            try:
+                self.model = tf.keras.models.load_model(cache_path)
+                self._predict_step = None
+                return self.model
+            except Exception as e:
+                logger.warning(f"Could not load cached LSTM model, retraining: {str(e)}")
+        
         # Build LSTM model
         logger.info("Building LSTM model")
+        policy = tf.keras.mixed_precision.Policy(LSTM_PRECISION_POLICY)
         self.model = Sequential([
-            LSTM(50, return_sequences=True, input_shape=(self.lookback, len(self.features))),
-            Dropout(0.2),
-            LSTM(50),
-            Dropout(0.2),
-            Dense(1)
+            LSTM(50, return_sequences=True, input_shape=(self.lookback, len(self.features)), dtype=policy),
+            Dropout(0.2, dtype=policy),
+            LSTM(50, dtype=policy),
+            Dropout(0.2, dtype=policy),
+            # One output per forecast day; kept in float32 so the loss is computed at full precision
+            Dense(self.model_horizon, dtype='float32')
         ])
         
-        self.model.compile(optimizer='adam', loss='mse')
+        # The model's own policy stays float32, so Keras won't add loss scaling for float16 by itself
+        optimizer = tf.keras.optimizers.Adam()
+        if policy.compute_dtype == 'float16':
+            optimizer = tf.keras.mixed_precision.LossScaleOptimizer(optimizer)
+        self.model.compile(optimizer=optimizer, loss='mse')
+        self._predict_step = None
+        
+        # Batch and prefetch so input preparation overlaps with training steps
+        train_dataset = tf.data.Dataset.from_tensor_slices((X_train, y_train)).batch(batch_size).prefetch(tf.data.AUTOTUNE)
+        val_dataset = tf.data.Dataset.from_tensor_slices((X_val, y_val)).batch(batch_size).prefetch(tf.data.AUTOTUNE)
         
         # Train the model
         logger.info(f"Training LSTM model for {epochs} epochs")
         self.model.fit(
-            X_train, y_train,
-            validation_data=(X_val, y_val),
+            train_dataset,
+            validation_data=val_dataset,
             epochs=epochs,
-            batch_size=batch_size,
             verbose=1
         )
         
         logger.info("LSTM model trained successfully")
+        
+        staging_path = _staging_path(cache_path)
+        try:
+            self.model.save(staging_path)
+            os.replace(staging_path, cache_path)
+        except Exception as e:
+            logger.warning(f"Could not cache LSTM model: {str(e)}")
+            if os.path.exists(staging_path):
+                os.remove(staging_path)
+        
         return self.model
     
+    def _get_predict_step(self):
+        """
+        Inference function for the current model, traced once
+        
+        Calling the model directly skips the batching and callback machinery of
+        model.predict, and the fixed input signature keeps the trace reusable.
+        """
+        if self._predict_step is None:
+            model = self.model
+            self._predict_step = tf.function(
+                lambda x: model(x, training=False),
+                input_signature=[tf.TensorSpec((1, self.lookback, len(self.features)), tf.float32)]
+            )
+        return self._predict_step
+    
     def predict(self, periods: int = 30) -> np.ndarray:
         """
         Generate forecasts for the specified number of periods
@@ -331,41 +838,32 @@ class LSTMForecaster:
         
         logger.info(f"Generating forecast for {periods} periods")
         
-        # Get the most recent data points
-        input_sequence = self.data.values[-self.lookback:]
-        input_sequence = np.reshape(input_sequence, (1, self.lookback, len(self.features)))
+        predict_step = self._get_predict_step()
         
-        # Generate forecasts recursively
-        forecasts = []
-        current_sequence = input_sequence.copy()
+        # Window buffer seeded with the most recent data points
+        current_sequence = np.empty((1, self.lookback, len(self.features)), dtype=np.float32)
+        current_sequence[0] = self.data.values[-self.lookback:]
         
-        for _ in range(periods):
-            # Predict the next value
-            next_pred = self.model.predict(current_sequence, verbose=0)
-            forecasts.append(next_pred[0, 0])
+        # Each forward pass predicts `horizon` days; only longer forecasts need more than one
+        forecasts = np.empty(periods, dtype=np.float32)
+        horizon = self.model_horizon
+        
+        for start in range(0, periods, horizon):
+            predictions = predict_step(current_sequence).numpy()[0]
+            forecasts[start:start + horizon] = predictions[:periods - start]
             
-            # Create a new row with the prediction
-            next_row = current_sequence[0, -1, :].copy()
-            next_row[0] = next_pred[0, 0]  # Update 'Units Sold'
+            if start + horizon >= periods:
+                break
             
-            # Update the sequence
-            current_sequence = np.append(current_sequence[:, 1:, :], 
-                                        np.reshape(next_row, (1, 1, len(self.features))), 
-                                        axis=1)
-        
-        # Inverse transform to get the actual values
-        forecast_values = np.zeros((len(forecasts), len(self.features)))
-        forecast_values[:, 0] = forecasts  # Set the 'Units Sold' column
-        
-        # For other columns, use the last values (simplified approach)
-        for i in range(1, len(self.features)):
-            forecast_values[:, i] = self.data.iloc[-1, i]
+            # Shift the window in place; new rows repeat the last one with the predictions as 'Units Sold'
+            last_row = current_sequence[0, -1, :].copy()
+            shift = min(horizon, self.lookback)
+            current_sequence[0, :-shift, :] = current_sequence[0, shift:, :]
+            current_sequence[0, -shift:, :] = last_row
+            current_sequence[0, -shift:, 0] = predictions[-shift:]
         
-        # Inverse transform
-        forecast_values = self.scaler.inverse_transform(forecast_values)
-        
-        # Extract only the 'Units Sold' column
-        result = forecast_values[:, 0]
+        # Inverse transform the 'Units Sold' column to get the actual values
+        result = self.scaler.inverse_transform_column(forecasts, 0)
         
         logger.info("Forecast generated successfully")
         return result
@@ -384,6 +882,25 @@ class EnsembleForecaster:
         self.lookback = lookback
         self.prophet_forecaster = ProphetForecaster(data_path)
         self.lstm_forecaster = LSTMForecaster(data_path, lookback)
+        # Held from train to predict by forecast() and by the inventory optimizer while it predicts
+        self.lock = threading.Lock()
+        
+    def forecast(self, product_id: Optional[str] = None, store_id: Optional[str] = None,
+                 periods: int = 30) -> pd.DataFrame:
+        """
+        Train both models on a product/store and forecast it as one step
+        
+        Args:
+            product_id (str, optional): Filter data for a specific product
+            store_id (str, optional): Filter data for a specific store
+            periods (int): Number of days to forecast
+            
+        Returns:
+            pd.DataFrame: Ensemble forecast results
+        """
+        with self.lock:
+            self.train(product_id, store_id)
+            return self.predict(periods)
         
     def train(self, product_id: Optional[str] = None, store_id: Optional[str] = None):
         """
@@ -411,7 +928,7 @@ class EnsembleForecaster:
             pd.DataFrame: Ensemble forecast results
         """
         # Get Prophet forecast
-        prophet_forecast = self.prophet_forecaster.predict(periods)
+        prophet_forecast = self.prophet_forecaster.predict_future_only(periods)
         
         # Get LSTM forecast
         lstm_forecast = self.lstm_forecaster.predict(periods)
@@ -423,23 +940,26 @@ class EnsembleForecaster:
         # Extract the relevant columns from Prophet forecast
         prophet_result = prophet_forecast[['ds', 'yhat', 'yhat_lower', 'yhat_upper']].tail(periods)
         
-        # Create a dataframe for LSTM forecast
-        lstm_result = pd.DataFrame({
-            'ds': prophet_result['ds'],
-            'lstm_forecast': lstm_forecast
+        yhat = prophet_result['yhat'].to_numpy()
+        yhat_lower = prophet_result['yhat_lower'].to_numpy()
+        yhat_upper = prophet_result['yhat_upper'].to_numpy()
+        
+        # Both forecasts cover the same last `periods` days, so they align by position
+        ensemble = prophet_weight * yhat + (1 - prophet_weight) * lstm_forecast
+        
+        # Confidence intervals keep the width of Prophet's interval
+        half_range = 0.5 * (yhat_upper - yhat_lower)
+        
+        ensemble_forecast = pd.DataFrame({
+            'ds': prophet_result['ds'].to_numpy(),
+            'yhat': yhat,
+            'yhat_lower': yhat_lower,
+            'yhat_upper': yhat_upper,
+            'lstm_forecast': lstm_forecast,
+            'ensemble_forecast': ensemble,
+            'ensemble_lower': ensemble - half_range,
+            'ensemble_upper': ensemble + half_range
         })
         
-        # Merge the forecasts
-        ensemble_forecast = prophet_result.merge(lstm_result, on='ds')
-        
-        # Calculate weighted average
-        ensemble_forecast['ensemble_forecast'] = (prophet_weight * ensemble_forecast['yhat'] + 
-                                                 (1 - prophet_weight) * ensemble_forecast['lstm_forecast'])
-        
-        # Calculate confidence intervals
-        prophet_range = ensemble_forecast['yhat_upper'] - ensemble_forecast['yhat_lower']
-        ensemble_forecast['ensemble_lower'] = ensemble_forecast['ensemble_forecast'] - prophet_range / 2
-        ensemble_forecast['ensemble_upper'] = ensemble_forecast['ensemble_forecast'] + prophet_range / 2
-        
         logger.info("Ensemble forecast generated successfully")
         return ensemble_forecast
\ No newline at end of file
@@ -1,12 +1,133 @@
 import pandas as pd
 import numpy as np
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple, Union
 import logging
-from models.forecasting import ProphetForecaster, EnsembleForecaster
+import threading
+from cachetools import LRUCache
+from joblib import Parallel, delayed
+from scipy.special import ndtr
+from models.forecasting import ProphetForecaster, EnsembleForecaster, read_retail_data
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Columns the optimizer reads from the retail data (missing ones are skipped)
+INVENTORY_COLUMNS = ['Date', 'Product ID', 'Store ID', 'Category', 'Region', 'Inventory Level', 'Price', 'Units Sold']
+
+# Rows per block of the stockout z-score matrix (about 1 MB of float64 over a 30-day
+# horizon, so a block stays cache resident); larger inputs are split across threads
+STOCKOUT_CHUNK_ROWS = 4096
+
+# Most recently used product/store series kept in the data and forecast caches
+CACHE_SIZE = 256
+
+def cumulative_demand_and_std(forecast: np.ndarray, forecast_std: np.ndarray,
+                              days: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Cumulative demand and its standard deviation (assuming independent days) over the horizon
+    
+    Uses one fresh buffer per result and computes in place within it.
+    
+    Args:
+        forecast: Array of daily demand forecasts
+        forecast_std: Array of daily demand forecast standard deviations
+        days: Number of days to look ahead
+        
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: Cumulative demand and cumulative standard deviation per day
+    """
+    cumulative_demand = np.cumsum(forecast[:days], dtype=float)
+    
+    cumulative_std = np.multiply(forecast_std[:days], forecast_std[:days], dtype=float)
+    np.cumsum(cumulative_std, out=cumulative_std)
+    np.sqrt(cumulative_std, out=cumulative_std)
+    
+    return cumulative_demand, cumulative_std
+
+
+def _max_stockout_probability(cumulative_demand: np.ndarray, cumulative_std: np.ndarray,
+                              inventory: np.ndarray) -> np.ndarray:
+    """
+    Highest daily stockout probability over the horizon for each inventory level
+    
+    Args:
+        cumulative_demand: Cumulative demand per day
+        cumulative_std: Cumulative standard deviation per day
+        inventory: Current inventory level per row
+        
+    Returns:
+        np.ndarray: Stockout probability (0-1) per row
+    """
+    z_scores = np.subtract.outer(cumulative_demand, inventory)
+    z_scores /= cumulative_std[:, None]
+    # (the CDF is monotonic, so it is applied once to each row's highest z-score)
+    return ndtr(z_scores.max(axis=0))
+
+
+def stockout_probabilities(cumulative_demand: np.ndarray, cumulative_std: np.ndarray,
+                           inventory: np.ndarray) -> np.ndarray:
+    """
+    Stockout probabilities for many rows, computed in row blocks across threads
+    
+    Rows are independent, so large inputs are split into blocks of STOCKOUT_CHUNK_ROWS;
+    NumPy releases the GIL inside each block, and the (days, rows) matrix never exists whole.
+    
+    Args:
+        cumulative_demand: Cumulative demand per day
+        cumulative_std: Cumulative standard deviation per day
+        inventory: Current inventory level per row
+        
+    Returns:
+        np.ndarray: Stockout probability (0-1) per row
+    """
+    if len(inventory) <= STOCKOUT_CHUNK_ROWS:
+        return _max_stockout_probability(cumulative_demand, cumulative_std, inventory)
+    
+    blocks = Parallel(n_jobs=-1, prefer='threads')(
+        delayed(_max_stockout_probability)(cumulative_demand, cumulative_std, inventory[start:start + STOCKOUT_CHUNK_ROWS])
+        for start in range(0, len(inventory), STOCKOUT_CHUNK_ROWS)
+    )
+    return np.concatenate(blocks)
+
+
+def aggregate_sorted(df: pd.DataFrame, keys: List[str], sums: List[str],
+                     means: List[str], firsts: List[str]) -> pd.DataFrame:
+    """
+    Group rows by key columns and reduce each group, using run boundaries instead of hashing
+    
+    Args:
+        df (pd.DataFrame): Rows to aggregate
+        keys (List[str]): Columns identifying a group
+        sums (List[str]): Columns to sum per group
+        means (List[str]): Columns to average per group
+        firsts (List[str]): Columns to take from the first row of each group
+        
+    Returns:
+        pd.DataFrame: One row per group with the key and aggregated columns
+    """
+    columns = keys + sums + means + firsts
+    
+    # Keys that are already unique need no reduction at all
+    if not df.duplicated(subset=keys).any():
+        return df[columns].reset_index(drop=True)
+    
+    df = df.sort_values(keys, kind='stable')
+    key_values = df[keys].to_numpy()
+    
+    # Each group is a run of equal keys; starts are where the keys change
+    changed = (key_values[1:] != key_values[:-1]).any(axis=1)
+    starts = np.flatnonzero(np.concatenate(([True], changed)))
+    counts = np.diff(np.append(starts, len(df)))
+    
+    result = {column: df[column].to_numpy()[starts] for column in keys + firsts}
+    for column in sums:
+        result[column] = np.add.reduceat(df[column].to_numpy(dtype=float), starts)
+    for column in means:
+        result[column] = np.add.reduceat(df[column].to_numpy(dtype=float), starts) / counts
+    
+    return pd.DataFrame(result, columns=columns)
+
+
 class InventoryOptimizer:
     def __init__(self, forecaster, safety_stock_factor: float = 1.5, lead_time: int = 7):
         """
@@ -20,8 +141,36 @@ class InventoryOptimizer:
         self.forecaster = forecaster
         self.safety_stock_factor = safety_stock_factor
         self.lead_time = lead_time
+        self._sqrt_lead = lead_time ** 0.5
+        self.data = None
+        
+        # Loaded inventory data keyed by (product_id, store_id), and forecast
+        # arrays keyed by (product_id, store_id, forecast_days); cleared by refresh()
+        self._data_cache: LRUCache = LRUCache(maxsize=CACHE_SIZE)
+        self._forecast_cache: LRUCache = LRUCache(maxsize=CACHE_SIZE)
+        self._cache_lock = threading.Lock()
+        
+    def refresh(self):
+        """
+        Drop cached inventory data and forecasts, e.g. after the data file changes
+        """
+        with self._cache_lock:
+            self._data_cache.clear()
+            self._forecast_cache.clear()
         self.data = None
         
+    def update_settings(self, lead_time: int, safety_stock_factor: float):
+        """
+        Update the restocking parameters
+        
+        Args:
+            lead_time (int): Number of days it takes to restock
+            safety_stock_factor (float): Multiplier for safety stock calculation
+        """
+        self.lead_time = lead_time
+        self._sqrt_lead = lead_time ** 0.5
+        self.safety_stock_factor = safety_stock_factor
+        
     def load_inventory_data(self, product_id: Optional[str] = None, store_id: Optional[str] = None):
         """
         Load and preprocess inventory data
@@ -31,29 +180,27 @@ class InventoryOptimizer:
             store_id (str, optional): Filter data for a specific store
         """
         logger.info(f"Loading inventory data from {self.forecaster.data_path}")
-        df = pd.read_csv(self.forecaster.data_path)
         
-        # Filter data if product_id and store_id are provided
+        # Reuse the forecasters' Parquet dataset; the series filter and the most
+        # recent date are applied before any rows are copied out of it
         if product_id and store_id:
             logger.info(f"Filtering data for Product ID: {product_id}, Store ID: {store_id}")
-            df = df[(df['Product ID'] == product_id) & (df['Store ID'] == store_id)]
-            
-            if df.empty:
-                logger.warning(f"No data found for Product ID: {product_id}, Store ID: {store_id}")
-                return None
+        latest_data = read_retail_data(self.forecaster.data_path, INVENTORY_COLUMNS, product_id, store_id,
+                                       latest_only=True)
         
-        # Use the most recent data
-        latest_date = df['Date'].max()
-        latest_data = df[df['Date'] == latest_date]
+        if product_id and store_id and latest_data.empty:
+            logger.warning(f"No data found for Product ID: {product_id}, Store ID: {store_id}")
+            return None
         
         # If no specific product and store were requested, aggregate by product and store
         if not product_id and not store_id:
-            inventory_levels = latest_data.groupby(['Product ID', 'Store ID', 'Category']).agg({
-                'Inventory Level': 'sum',
-                'Price': 'mean',
-                'Units Sold': 'sum',
-                'Region': 'first'
-            }).reset_index()
+            keys = [c for c in ['Product ID', 'Store ID', 'Category'] if c in latest_data.columns]
+            inventory_levels = aggregate_sorted(
+                latest_data, keys,
+                sums=['Inventory Level', 'Units Sold'],
+                means=['Price'],
+                firsts=[c for c in ['Region'] if c in latest_data.columns]
+            )
         else:
             inventory_levels = latest_data
         
@@ -61,39 +208,57 @@ class InventoryOptimizer:
         logger.info(f"Inventory data loaded successfully. Shape: {inventory_levels.shape}")
         return inventory_levels
     
-    def calculate_reorder_point(self, forecast, lead_time: Optional[int] = None) -> float:
+    def _precompute_forecast_stats(self, forecast, lead_time: int) -> Tuple[float, float]:
+        """
+        Mean and standard deviation of daily demand during the lead time, computed once per forecast
+        
+        Args:
+            forecast: Array of daily demand forecasts
+            lead_time: Number of days it takes to restock
+            
+        Returns:
+            Tuple[float, float]: Average daily demand and its standard deviation
+        """
+        lead_demand = forecast[:lead_time]
+        return float(lead_demand.mean()), float(lead_demand.std())
+    
+    def calculate_reorder_point(self, forecast, lead_time: Optional[int] = None,
+                                stats: Optional[Tuple[float, float]] = None) -> float:
         """
         Calculate reorder point based on forecasted demand
         
         Args:
             forecast: Array of daily demand forecasts
             lead_time: Number of days it takes to restock (overrides instance lead_time if provided)
+            stats: Precomputed (average, std) of lead-time demand from _precompute_forecast_stats
             
         Returns:
             float: The inventory level at which to place an order
         """
-        if lead_time is None:
+        if lead_time is None or lead_time == self.lead_time:
             lead_time = self.lead_time
+            sqrt_lead = self._sqrt_lead
+        else:
+            sqrt_lead = lead_time ** 0.5
             
-        logger.info(f"Calculating reorder point with lead time: {lead_time}")
-        
-        # Calculate average daily demand during lead time
-        avg_daily_demand = forecast[:lead_time].mean()
+        logger.debug("Calculating reorder point with lead time: %s", lead_time)
         
-        # Calculate standard deviation of demand during lead time
-        std_demand = forecast[:lead_time].std()
+        # Average and standard deviation of daily demand during lead time
+        if stats is None:
+            stats = self._precompute_forecast_stats(forecast, lead_time)
+        avg_daily_demand, std_demand = stats
         
         # Calculate safety stock
-        safety_stock = self.safety_stock_factor * std_demand * (lead_time ** 0.5)
+        safety_stock = self.safety_stock_factor * std_demand * sqrt_lead
         
         # Calculate reorder point
         reorder_point = (avg_daily_demand * lead_time) + safety_stock
         
-        logger.info(f"Reorder point calculated: {reorder_point}")
+        logger.debug("Reorder point calculated: %s", reorder_point)
         return reorder_point
     
     def calculate_eoq(self, annual_demand: float, ordering_cost: float, 
-                     holding_cost_percentage: float, unit_cost: float) -> float:
+                     holding_cost_percentage: float, unit_cost: Union[float, np.ndarray]) -> Union[float, np.ndarray]:
         """
         Calculate Economic Order Quantity
         
@@ -101,80 +266,77 @@ class InventoryOptimizer:
             annual_demand: Annual demand quantity
             ordering_cost: Cost per order
             holding_cost_percentage: Annual holding cost as percentage of unit cost
-            unit_cost: Cost per unit
+            unit_cost: Cost per unit, or an array of unit costs
             
         Returns:
-            float: Economic Order Quantity
+            Economic Order Quantity, elementwise for an array of unit costs
         """
-        logger.info("Calculating Economic Order Quantity")
+        logger.debug("Calculating Economic Order Quantity")
         
         holding_cost = holding_cost_percentage * unit_cost
-        eoq = (2 * annual_demand * ordering_cost / holding_cost) ** 0.5
+        eoq = np.sqrt(2 * annual_demand * ordering_cost / holding_cost)
         
-        logger.info(f"EOQ calculated: {eoq}")
+        logger.debug("EOQ calculated: %s", eoq)
         return eoq
     
-    def calculate_stockout_probability(self, current_inventory: float, 
+    def calculate_stockout_probability(self, current_inventory: Union[float, np.ndarray], 
                                       forecast: np.ndarray, 
                                       forecast_std: np.ndarray,
-                                      days: int = 30) -> float:
+                                      days: int = 30) -> Union[float, np.ndarray]:
         """
         Calculate the probability of stockout within the specified days
         
         Args:
-            current_inventory: Current inventory level
+            current_inventory: Current inventory level, or an array of levels
             forecast: Array of daily demand forecasts
             forecast_std: Array of daily demand forecast standard deviations
             days: Number of days to look ahead
             
         Returns:
-            float: Probability of stockout (0-1)
+            Probability of stockout (0-1), elementwise for an array of inventory levels
         """
-        logger.info(f"Calculating stockout probability for {days} days")
-        
-        # Calculate cumulative demand
-        cumulative_demand = np.cumsum(forecast[:days])
+        logger.debug("Calculating stockout probability for %s days", days)
         
-        # Calculate cumulative standard deviation (assuming independence)
-        cumulative_std = np.sqrt(np.cumsum(forecast_std[:days] ** 2))
+        cumulative_demand, cumulative_std = cumulative_demand_and_std(forecast, forecast_std, days)
         
-        # Calculate the probability of stockout for each day
-        from scipy.stats import norm
-        z_scores = (cumulative_demand - current_inventory) / cumulative_std
-        stockout_probs = norm.cdf(z_scores)
+        # Many levels against one forecast: a single (days, N) matrix op, tiled by rows
+        if np.ndim(current_inventory):
+            return stockout_probabilities(cumulative_demand, cumulative_std, np.asarray(current_inventory, dtype=float))
         
-        # Return the maximum probability
-        max_prob = np.max(stockout_probs)
+        # z-scores overwrite the cumulative demand buffer. The normal CDF is monotonic,
+        # so the highest daily stockout probability comes from the highest z-score
+        z_scores = np.subtract(cumulative_demand, current_inventory, out=cumulative_demand)
+        np.divide(z_scores, cumulative_std, out=z_scores)
+        max_prob = ndtr(np.max(z_scores))
         
-        logger.info(f"Stockout probability calculated: {max_prob}")
+        logger.debug("Stockout probability calculated: %s", max_prob)
         return max_prob
     
-    def calculate_reorder_points(self, product_id: Optional[str] = None, 
-                               store_id: Optional[str] = None,
-                               forecast_days: int = 30) -> pd.DataFrame:
+    def _get_forecast(self, product_id: Optional[str], store_id: Optional[str],
+                      forecast_days: int) -> Tuple[np.ndarray, np.ndarray]:
         """
-        Calculate reorder points based on forecasted demand
+        Daily demand forecast and its standard deviation, reused until the models are retrained
         
         Args:
-            product_id (str, optional): Filter data for a specific product
-            store_id (str, optional): Filter data for a specific store
+            product_id (str, optional): Product the forecast is for
+            store_id (str, optional): Store the forecast is for
             forecast_days (int): Number of days to forecast
             
         Returns:
-            pd.DataFrame: Reorder points for each product/store
+            Tuple[np.ndarray, np.ndarray]: Forecast values and standard deviations
         """
-        if self.data is None:
-            self.load_inventory_data(product_id, store_id)
-            
-        if self.data is None or self.data.empty:
-            logger.error("No inventory data available")
-            return None
-        
-        logger.info("Calculating reorder points for inventory")
-        
-        # Generate forecasts
+        # Entries remember the fitted models they came from, so retraining invalidates them
+        models = self._fitted_models()
+        key = (product_id, store_id, forecast_days)
+        with self._cache_lock:
+            cached = self._forecast_cache.get(key)
+        if cached is not None and all(a is b for a, b in zip(cached[0], models)):
+            return cached[1], cached[2]
+        
+        # Generate forecasts; the forecaster's lock keeps forecast() calls from retraining it meanwhile
         if isinstance(self.forecaster, EnsembleForecaster):
-            ensemble_forecast = self.forecaster.predict(forecast_days)
+            with self.forecaster.lock:
+                ensemble_forecast = self.forecaster.predict(forecast_days)
             forecast_values = ensemble_forecast['ensemble_forecast'].values
             forecast_lower = ensemble_forecast['ensemble_lower'].values
             forecast_upper = ensemble_forecast['ensemble_upper'].values
@@ -183,7 +345,8 @@ class InventoryOptimizer:
             forecast_std = (forecast_upper - forecast_lower) / 3.92  # 95% confidence interval is approx. 1.96 std deviations each way
         else:
             # Using only Prophet forecaster
-            prophet_forecast = self.forecaster.predict(forecast_days)
+            with self.forecaster.lock:
+                prophet_forecast = self.forecaster.predict_future_only(forecast_days)
             forecast_values = prophet_forecast['yhat'].tail(forecast_days).values
             forecast_lower = prophet_forecast['yhat_lower'].tail(forecast_days).values
             forecast_upper = prophet_forecast['yhat_upper'].tail(forecast_days).values
@@ -191,66 +354,91 @@ class InventoryOptimizer:
             # Estimate standard deviation from confidence intervals
             forecast_std = (forecast_upper - forecast_lower) / 3.92
         
+        with self._cache_lock:
+            self._forecast_cache[key] = (models, forecast_values, forecast_std)
+        return forecast_values, forecast_std
+    
+    def _fitted_models(self) -> Tuple[Any, ...]:
+        """
+        The fitted model objects behind the forecaster; a new object means it was retrained
+        """
+        if isinstance(self.forecaster, EnsembleForecaster):
+            return (self.forecaster.prophet_forecaster.model, self.forecaster.lstm_forecaster.model)
+        return (self.forecaster.model,)
+    
+    def calculate_reorder_points(self, product_id: Optional[str] = None, 
+                               store_id: Optional[str] = None,
+                               forecast_days: int = 30) -> pd.DataFrame:
+        """
+        Calculate reorder points based on forecasted demand
+        
+        Args:
+            product_id (str, optional): Filter data for a specific product
+            store_id (str, optional): Filter data for a specific store
+            forecast_days (int): Number of days to forecast
+            
+        Returns:
+            pd.DataFrame: Reorder points for each product/store
+        """
+        data_key = (product_id, store_id)
+        with self._cache_lock:
+            data = self._data_cache.get(data_key)
+        if data is None:
+            data = self.load_inventory_data(product_id, store_id)
+            with self._cache_lock:
+                self._data_cache[data_key] = data
+            
+        if data is None or data.empty:
+            logger.error("No inventory data available")
+            return None
+        
+        logger.info(f"Calculating reorder points for {len(data)} inventory rows")
+        
+        forecast_values, forecast_std = self._get_forecast(product_id, store_id, forecast_days)
+        
         # Default parameters for EOQ calculation
         ordering_cost = 25.0  # Cost per order (default)
         holding_cost_percentage = 0.25  # 25% of unit cost per year (default)
         
         # Calculate reorder points and EOQ for each product/store
-        results = []
-        
-        for _, row in self.data.iterrows():
-            # Get current inventory
-            current_inventory = row['Inventory Level']
-            
-            # Get unit price
-            unit_price = row['Price']
-            
-            # Calculate annual demand (based on 30-day forecast)
-            annual_demand = forecast_values.mean() * 365
-            
-            # Calculate reorder point
-            reorder_point = self.calculate_reorder_point(forecast_values, self.lead_time)
-            
-            # Calculate EOQ
-            eoq = self.calculate_eoq(annual_demand, ordering_cost, holding_cost_percentage, unit_price)
-            
-            # Calculate days until stockout (assuming average demand)
-            avg_daily_demand = forecast_values.mean()
-            days_until_stockout = float('inf') if avg_daily_demand <= 0 else current_inventory / avg_daily_demand
-            
-            # Calculate stockout probability
-            stockout_prob = self.calculate_stockout_probability(current_inventory, forecast_values, forecast_std)
-            
-            # Determine status
-            if current_inventory <= reorder_point:
-                status = 'Reorder needed'
-            else:
-                status = 'Stock sufficient'
-            
-            # Calculate optimal order quantity
-            if current_inventory < reorder_point:
-                # Order enough to reach reorder point + EOQ
-                optimal_order = max(0, eoq)
-            else:
-                optimal_order = 0
-            
-            # Add result
-            result = {
-                'Product ID': row['Product ID'] if 'Product ID' in row else None,
-                'Store ID': row['Store ID'] if 'Store ID' in row else None,
-                'Category': row['Category'] if 'Category' in row else None,
-                'Region': row['Region'] if 'Region' in row else None,
-                'Current Inventory': current_inventory,
-                'Reorder Point': reorder_point,
-                'EOQ': eoq,
-                'Optimal Order Quantity': optimal_order,
-                'Days Until Stockout': days_until_stockout,
-                'Stockout Probability': stockout_prob,
-                'Price': unit_price,
-                'Status': status
-            }
-            
-            results.append(result)
+        inventory = data['Inventory Level'].to_numpy(dtype=float)
+        prices = data['Price'].to_numpy(dtype=float)
+        
+        # Everything derived from the forecast alone is shared by all rows
+        avg_daily_demand = float(forecast_values.mean())  # computed once and reused below
+        annual_demand = avg_daily_demand * 365  # based on the forecast period
+        lead_stats = self._precompute_forecast_stats(forecast_values, self.lead_time)
+        reorder_point = self.calculate_reorder_point(forecast_values, self.lead_time, lead_stats)
+        reorder_points = np.full(len(inventory), reorder_point, dtype=float)
+        
+        # Calculate EOQ
+        eoqs = self.calculate_eoq(annual_demand, ordering_cost, holding_cost_percentage, prices)
+        
+        # Calculate days until stockout (assuming average demand)
+        if avg_daily_demand <= 0:
+            days_until_stockout = np.full(len(inventory), np.inf)
+        else:
+            days_until_stockout = inventory / avg_daily_demand
+        
+        # Calculate stockout probability: highest daily probability over the horizon, per row
+        stockout_probs = self.calculate_stockout_probability(inventory, forecast_values, forecast_std)
+        
+        # Identifier columns are optional depending on the dataset
+        results = {
+            column: data[column].to_numpy() if column in data.columns else None
+            for column in ['Product ID', 'Store ID', 'Category', 'Region']
+        }
+        results.update({
+            'Current Inventory': inventory,
+            'Reorder Point': reorder_points,
+            'EOQ': eoqs,
+            # Order enough to reach reorder point + EOQ
+            'Optimal Order Quantity': np.where(inventory < reorder_points, np.maximum(0, eoqs), 0),
+            'Days Until Stockout': days_until_stockout,
+            'Stockout Probability': stockout_probs,
+            'Price': prices,
+            'Status': np.where(inventory <= reorder_points, 'Reorder needed', 'Stock sufficient')
+        })
         
         results_df = pd.DataFrame(results)
         logger.info("Reorder points calculated successfully")
@@ -298,9 +486,9 @@ class InventoryOptimizer:
         Returns:
             Dict[str, Any]: Inventory health metrics
         """
-        recommendations = self.get_recommendations(product_id, store_id, forecast_days)
+        inventory_data = self.calculate_reorder_points(product_id, store_id, forecast_days)
         
-        if not recommendations:
+        if inventory_data is None or inventory_data.empty:
             logger.error("No recommendations available for inventory health metrics")
             return {
                 'total_products': 0,
@@ -313,16 +501,17 @@ class InventoryOptimizer:
         
         logger.info("Calculating inventory health metrics")
         
-        total_products = len(recommendations)
-        products_needing_reorder = sum(1 for r in recommendations if r['Status'] == 'Reorder needed')
-        total_reorder_value = sum(r['Optimal Order Quantity'] * r['Price'] for r in recommendations)
+        total_products = len(inventory_data)
+        products_needing_reorder = int(inventory_data['Status'].eq('Reorder needed').sum())
+        total_reorder_value = float((inventory_data['Optimal Order Quantity'] * inventory_data['Price']).sum())
         
-        # Calculate average days until stockout (excluding infinity values)
-        days_until_stockout_values = [r['Days Until Stockout'] for r in recommendations if r['Days Until Stockout'] != float('inf')]
-        average_days_until_stockout = sum(days_until_stockout_values) / len(days_until_stockout_values) if days_until_stockout_values else float('inf')
+        # Calculate average days until stockout (excluding infinite and missing values)
+        days_until_stockout = inventory_data['Days Until Stockout'].to_numpy(dtype=float)
+        days_until_stockout = days_until_stockout[np.isfinite(days_until_stockout)]
+        average_days_until_stockout = float(days_until_stockout.mean()) if days_until_stockout.size else float('inf')
         
         # Calculate high risk products (stockout probability > 25%)
-        high_risk_products = sum(1 for r in recommendations if r['Stockout Probability'] > 0.25)
+        high_risk_products = int(inventory_data['Stockout Probability'].gt(0.25).sum())
         
         return {
             'total_products': total_products,
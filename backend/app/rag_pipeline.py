@@ -2,7 +2,14 @@ import pandas as pd
 import numpy as np
 from langchain.text_splitter import RecursiveCharacterTextSplitter
 from langchain.embeddings import HuggingFaceEmbeddings
-from langchain.vectorstores import Chroma
+from langchain_community.vectorstores import FAISS
+from langchain_community.vectorstores.utils import DistanceStrategy
+from langchain_community.docstore.in_memory import InMemoryDocstore
+from langchain.schema import Document
+import faiss
+import torch
+import pyarrow as pa
+import pyarrow.csv as pv
 from langchain.chains import RetrievalQA
 from langchain_community.llms import HuggingFaceHub
 from langchain.prompts import PromptTemplate
@@ -11,9 +18,15 @@ from dotenv import load_dotenv
 from typing import Dict, List, Optional, Union
 from datetime import datetime
 import logging
-from utils.api_integrations import ExternalDataAnalyzer
+from utils.api_integrations import get_external_analyzer
 import time
-from tqdm import tqdm
+from concurrent.futures import Future, ThreadPoolExecutor
+import queue
+from functools import lru_cache
+import hashlib
+import sqlite3
+import threading
+from cachetools import TTLCache
 
 load_dotenv()
 
@@ -21,6 +34,331 @@ load_dotenv()
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# (label, column) pairs making up the text of each inventory record
+RECORD_FIELDS = [
+    ('Date', 'Date'),
+    ('Store ID', 'Store ID'),
+    ('Category', 'Category'),
+    ('Region', 'Region'),
+    ('Inventory Level', 'Inventory Level'),
+    ('Units Sold', 'Units Sold'),
+    ('Units Ordered', 'Units Ordered'),
+    ('Demand Forecast', 'Demand Forecast'),
+    ('Price', 'Price'),
+    ('Discount', 'Discount'),
+    ('Weather', 'Weather Condition'),
+    ('Holiday/Promotion', 'Holiday/Promotion'),
+    ('Competitor Pricing', 'Competitor Pricing'),
+    ('Seasonality', 'Season'),
+    ('Product Type', 'Category_Type'),
+    ('Product Name', 'Name'),
+]
+
+# Text of one record: a "label: value" line per field
+RECORD_TEMPLATE = "\n".join(f"{label}: {{}}" for label, _ in RECORD_FIELDS).format
+
+# Threads for the external API calls made while answering a query
+_external_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="rag-external")
+
+# Device for the embedding model, and its default encode batch size there
+EMBEDDING_DEVICE = "cuda" if torch.cuda.is_available() else "cpu"
+DEFAULT_EMBED_BATCH_SIZE = 256 if EMBEDDING_DEVICE == "cuda" else 64
+
+# Derived numeric columns and the inventory columns they come from
+NUMERIC_ALIASES = {
+    'current_stock': 'Inventory Level',
+    'price': 'Price',
+    'historical_sales': 'Units Sold',
+}
+
+# Count columns, read as integers so record text shows "144" rather than "144.0"
+INTEGER_COLUMNS = ('Inventory Level', 'Units Sold', 'Units Ordered')
+
+# Directory the FAISS index and its documents are saved to
+VECTOR_STORE_DIR = "./faiss_index"
+# File in the vector store directory holding the key of the texts and settings it was built from
+VECTOR_STORE_KEY_FILE = "index_key"
+
+# SQLite file caching chunk embeddings across runs, keyed by model and text
+EMBEDDING_CACHE_PATH = os.getenv("EMBEDDING_CACHE_PATH", "./embedding_cache.sqlite")
+
+# Cosine similarity above which a previous question's answer is reused
+QUERY_CACHE_THRESHOLD = 0.95
+# Questions remembered per (product, category, city) context
+QUERY_CACHE_SIZE = 64
+# Contexts in the answer cache; each expires with the shortest external API cache (trends, 5 minutes)
+QUERY_CACHE_CONTEXTS = 256
+QUERY_CACHE_TTL = 300
+
+# External context returned when the weather or social data can't be fetched
+EXTERNAL_DATA_UNAVAILABLE = "External data unavailable"
+
+# Corpora up to this size are searched exactly: one float32 matrix product per query
+# batch is cheaper than decoding quantized codes at this scale
+EXACT_SEARCH_MAX_VECTORS = int(os.getenv("EXACT_SEARCH_MAX_VECTORS", "20000"))
+# Corpora larger than this use an IVF-PQ index instead of scanning every vector
+IVFPQ_MIN_VECTORS = 100_000
+# Inverted lists probed per IVF-PQ query
+IVF_NPROBE = 16
+
+# Per-dimension storage of the scalar-quantized index: "8bit" (1 byte) or "fp16" (2 bytes,
+# lossless for these embeddings in practice and needing no training)
+SCALAR_QUANTIZERS = {
+    "8bit": faiss.ScalarQuantizer.QT_8bit,
+    "fp16": faiss.ScalarQuantizer.QT_fp16,
+}
+VECTOR_QUANTIZATION = os.getenv("VECTOR_QUANTIZATION", "8bit")
+
+# FAISS OpenMP threads per process; unset keeps FAISS's default, so several
+# workers on one host can each be given a share of the cores
+FAISS_THREADS = os.getenv("FAISS_THREADS")
+if FAISS_THREADS:
+    faiss.omp_set_num_threads(int(FAISS_THREADS))
+
+# Low-cardinality text columns, read dictionary-encoded into pandas categoricals
+CATEGORICAL_COLUMNS = ['Store ID', 'Category', 'Region', 'Weather Condition', 'Season', 'Category_Type', 'Name']
+
+def read_inventory_csv(path: str) -> pd.DataFrame:
+    """
+    Read the inventory columns the pipeline uses with pyarrow's multithreaded reader
+    
+    Args:
+        path (str): Path to the CSV file
+        
+    Returns:
+        pd.DataFrame: The record columns, with the count columns typed as nullable
+            integers, the other numeric inventory columns as float64 and the
+            low-cardinality text columns as categoricals
+    """
+    table = pv.read_csv(path, convert_options=pv.ConvertOptions(
+        include_columns=list(dict.fromkeys(column for _, column in RECORD_FIELDS)),
+        column_types={
+            **{column: pa.float64() for column in NUMERIC_ALIASES.values()},
+            **{column: pa.int64() for column in INTEGER_COLUMNS},
+            **{column: pa.dictionary(pa.int32(), pa.string()) for column in CATEGORICAL_COLUMNS}
+        }
+    ))
+    # Nullable integers keep a missing count from turning the whole column into floats
+    return table.to_pandas(types_mapper={pa.int64(): pd.Int64Dtype()}.get)
+
+
+class MicroBatcher:
+    """Coalesce concurrent single-item calls into one batched call"""
+    
+    def __init__(self, batch_fn, max_batch: int = 32, max_latency_ms: float = 10.0):
+        """
+        Start collecting items for batch_fn.
+        
+        Args:
+            batch_fn: Function mapping a list of items to an indexable of results, in order
+            max_batch (int): Most items passed to one batch_fn call
+            max_latency_ms (float): Longest an item waits for others to join its batch
+        """
+        self.batch_fn = batch_fn
+        self.max_batch = max_batch
+        self.max_latency = max_latency_ms / 1000
+        self._queue: "queue.Queue[tuple]" = queue.Queue()
+        self._worker = threading.Thread(target=self._run, name="rag-microbatch", daemon=True)
+        self._worker.start()
+    
+    def submit(self, item) -> Future:
+        """Queue an item; the future resolves to its result from the batch it joins"""
+        future = Future()
+        self._queue.put((item, future))
+        return future
+    
+    def __call__(self, item):
+        """Process one item as part of whatever batch it lands in"""
+        return self.submit(item).result()
+    
+    def _run(self) -> None:
+        while True:
+            pending = [self._queue.get()]
+            deadline = time.monotonic() + self.max_latency
+            while len(pending) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    pending.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            
+            items, futures = zip(*pending)
+            try:
+                results = self.batch_fn(list(items))
+            except Exception as e:
+                for future in futures:
+                    future.set_exception(e)
+                continue
+            for future, result in zip(futures, results):
+                future.set_result(result)
+
+
+class EmbeddingCache:
+    """Persistent map from SHA-256(model name + text) to its float32 embedding"""
+    
+    # Stay below SQLite's default limit on bound parameters per statement
+    _LOOKUP_BATCH = 900
+    
+    def __init__(self, path: str = EMBEDDING_CACHE_PATH):
+        """
+        Open (or create) the cache database.
+        
+        Args:
+            path (str): Path to the SQLite file
+        """
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            # WAL with NORMAL sync makes each batch commit an append instead of a full
+            # journal flush, while a crash still leaves a consistent cache
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute("CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, vector BLOB NOT NULL)")
+    
+    @staticmethod
+    def key(model_name: str, text: str) -> str:
+        """Cache key of a text embedded by a model"""
+        return hashlib.sha256((model_name + text).encode()).hexdigest()
+    
+    def get_many(self, keys: List[str]) -> Dict[str, np.ndarray]:
+        """
+        Look up cached embeddings.
+        
+        Args:
+            keys (List[str]): Cache keys
+            
+        Returns:
+            Dict[str, np.ndarray]: Embeddings for the keys that are cached
+        """
+        found = {}
+        with self._lock:
+            for start in range(0, len(keys), self._LOOKUP_BATCH):
+                batch = keys[start:start + self._LOOKUP_BATCH]
+                rows = self._conn.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({','.join('?' * len(batch))})", batch
+                )
+                found.update((key, np.frombuffer(vector, dtype=np.float32)) for key, vector in rows)
+        return found
+    
+    def put_many(self, keys: List[str], vectors: np.ndarray) -> None:
+        """
+        Store embeddings.
+        
+        Args:
+            keys (List[str]): Cache keys
+            vectors (np.ndarray): float32 embeddings, one row per key
+        """
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (key, vector) VALUES (?, ?)",
+                zip(keys, (row.tobytes() for row in vectors.astype(np.float32, copy=False)))
+            )
+
+
+def build_faiss_index(embeddings: np.ndarray) -> faiss.Index:
+    """
+    Build an inner-product FAISS index sized for the corpus
+    
+    Small corpora use an exact flat index, a BLAS matrix product over the raw vectors.
+    Mid-sized ones use scalar quantization (VECTOR_QUANTIZATION), which still scans every
+    vector at a fraction of the bytes. Large ones use IVF-PQ: sqrt(N) inverted lists and 8-bit product codes with d/8 subquantizers,
+    so a query scans a few lists of compact codes.
+    
+    Args:
+        embeddings (np.ndarray): Normalized float32 vectors, one per row
+        
+    Returns:
+        faiss.Index: Trained index containing all the vectors
+    """
+    n, d = embeddings.shape
+    
+    if n <= EXACT_SEARCH_MAX_VECTORS:
+        index = faiss.IndexFlatIP(d)
+    elif n > IVFPQ_MIN_VECTORS:
+        nlist = int(np.sqrt(n))
+        m = d // 8 if d % 8 == 0 else 1
+        quantizer = faiss.IndexFlatIP(d)
+        index = faiss.IndexIVFPQ(quantizer, d, nlist, m, 8, faiss.METRIC_INNER_PRODUCT)
+        
+        # Training on a random sample is enough for the coarse and PQ centroids
+        sample_size = min(n, max(256 * nlist, 50_000))
+        sample = np.random.default_rng(0).choice(n, size=sample_size, replace=False)
+        index.train(embeddings[sample])
+        index.nprobe = IVF_NPROBE
+    else:
+        # Scalar quantization stores each dimension in one or two bytes instead of four
+        quantizer_type = SCALAR_QUANTIZERS.get(VECTOR_QUANTIZATION)
+        if quantizer_type is None:
+            logger.warning(f"Unknown VECTOR_QUANTIZATION '{VECTOR_QUANTIZATION}', using 8bit")
+            quantizer_type = faiss.ScalarQuantizer.QT_8bit
+        index = faiss.IndexScalarQuantizer(d, quantizer_type, faiss.METRIC_INNER_PRODUCT)
+        index.train(embeddings)
+    
+    index.add(embeddings)
+    return index
+
+
+def _set_search_params(index: faiss.Index) -> None:
+    """
+    Restore query-time parameters that are not saved with an index
+    
+    Args:
+        index (faiss.Index): Index loaded from disk
+    """
+    try:
+        faiss.extract_index_ivf(index).nprobe = IVF_NPROBE
+    except RuntimeError:
+        pass  # not an IVF index
+
+
+def to_available_gpus(index: faiss.Index) -> faiss.Index:
+    """
+    Copy an index to all visible GPUs for faster batched search, if the build supports it
+    
+    Args:
+        index (faiss.Index): CPU index
+        
+    Returns:
+        faiss.Index: The GPU index, or the CPU index when no GPU can hold it
+    """
+    if not hasattr(faiss, "index_cpu_to_all_gpus") or faiss.get_num_gpus() == 0:
+        return index
+    
+    try:
+        gpu_index = faiss.index_cpu_to_all_gpus(index)
+        logger.info(f"FAISS index moved to {faiss.get_num_gpus()} GPU(s)")
+        return gpu_index
+    except RuntimeError as e:
+        # Not every index type has a GPU implementation
+        logger.warning(f"Keeping FAISS index on CPU: {str(e)}")
+        return index
+
+
+@lru_cache(maxsize=4)
+def _load_embeddings(model_name: str) -> HuggingFaceEmbeddings:
+    """
+    Load an embedding model once per process and share it between pipelines
+    
+    Args:
+        model_name (str): Name of the sentence-transformers model
+        
+    Returns:
+        HuggingFaceEmbeddings: Embeddings wrapping the loaded SentenceTransformer
+    """
+    # Queries are normalized like the indexed chunks so inner product is cosine similarity
+    embeddings = HuggingFaceEmbeddings(
+        model_name=model_name,
+        model_kwargs={"device": EMBEDDING_DEVICE},
+        encode_kwargs={"normalize_embeddings": True}
+    )
+    if EMBEDDING_DEVICE == "cuda":
+        # Half precision halves VRAM and runs on tensor cores
+        embeddings.client.half()
+    return embeddings
+
+
 class RetailRAGPipeline:
     def __init__(
         self,
@@ -28,7 +366,8 @@ class RetailRAGPipeline:
         model_name: str = "sentence-transformers/all-mpnet-base-v2",
         chunk_size: int = 1000,
         chunk_overlap: int = 200,
-        batch_size: int = 32  # Added batch processing parameter increace 
+        batch_size: Optional[int] = None,  # Texts per embedding batch
+        vector_store_dir: str = VECTOR_STORE_DIR
     ):
         """
         Initialize the RAG pipeline for retail demand forecasting.
@@ -38,17 +377,32 @@ class RetailRAGPipeline:
             model_name (str): Name of the embedding model to use
             chunk_size (int): Size of text chunks for processing
             chunk_overlap (int): Overlap between text chunks
-            batch_size (int): Number of documents to process in a batch
+            batch_size (int, optional): Number of texts embedded per encoder batch
+                (256 on GPU, 64 on CPU by default)
+            vector_store_dir (str): Directory the FAISS index is saved to and reused from
         """
         self.data_path = data_path
-        self.embeddings = HuggingFaceEmbeddings(model_name=model_name)
+        self.model_name = model_name
+        self.embeddings = _load_embeddings(model_name)
+        self.embedding_cache = None
+        # Semantic answer cache: per external context, an inner-product index of
+        # previous question embeddings and the answers in the same order
+        self._qcache: TTLCache = TTLCache(maxsize=QUERY_CACHE_CONTEXTS, ttl=QUERY_CACHE_TTL)
+        self._qcache_lock = threading.Lock()
+        # Questions arriving together from concurrent requests are embedded in one encoder call
+        self._question_embedder = MicroBatcher(self.embed_queries)
         self.vector_store = None
         self.qa_chain = None
-        self.external_analyzer = ExternalDataAnalyzer()
+        self.external_analyzer = get_external_analyzer()
         self.chunk_size = chunk_size
         self.chunk_overlap = chunk_overlap
+        self.text_splitter = RecursiveCharacterTextSplitter(
+            chunk_size=chunk_size,
+            chunk_overlap=chunk_overlap
+        )
         self.processed_data = None
-        self.batch_size = batch_size
+        self.batch_size = batch_size or DEFAULT_EMBED_BATCH_SIZE
+        self.vector_store_dir = vector_store_dir
         
     def validate_csv_data(self, df: pd.DataFrame) -> pd.DataFrame:
         """
@@ -67,11 +421,12 @@ class RetailRAGPipeline:
         if missing_columns:
             raise ValueError(f"Missing required columns: {missing_columns}")
         
-        # Clean data
+        # Clean data; numeric columns are typed by the CSV reader, so only
+        # frames built elsewhere still need converting
         df = df.dropna(subset=required_columns)
-        df['current_stock'] = pd.to_numeric(df['Inventory Level'], errors='coerce')
-        df['price'] = pd.to_numeric(df['Price'], errors='coerce')
-        df['historical_sales'] = pd.to_numeric(df['Units Sold'], errors='coerce')
+        for alias, column in NUMERIC_ALIASES.items():
+            values = df[column]
+            df[alias] = values if pd.api.types.is_numeric_dtype(values) else pd.to_numeric(values, errors='coerce')
         
         return df
     
@@ -90,56 +445,35 @@ class RetailRAGPipeline:
         try:
             print(f"Loading data from {self.data_path}...")
             start_time = time.time()
-            df = pd.read_csv(self.data_path)
+            df = read_inventory_csv(self.data_path)
             print(f"Data loaded: {len(df)} rows, {df.shape[1]} columns")
             
             # Cache the processed data
             self.processed_data = df
             
-            # Convert dataframe to text representation
+            # Convert dataframe to text representation: each record string is built
+            # once from the template instead of through one concatenation per field
             print("Converting data to text format...")
-            texts = []
-            
-            # Process in chunks for better memory management
-            chunk_size = 1000  # Process 1000 rows at a time
-            total_chunks = (len(df) // chunk_size) + (1 if len(df) % chunk_size > 0 else 0)
-            
-            for i in tqdm(range(total_chunks), desc="Processing data chunks"):
-                start_idx = i * chunk_size
-                end_idx = min((i + 1) * chunk_size, len(df))
-                chunk_df = df.iloc[start_idx:end_idx]
-                
-                for _, row in chunk_df.iterrows():
-                    # Create detailed text representation of each inventory record
-                    text = f"""
-                    Date: {row['Date']}
-                    Store ID: {row['Store ID']}
-                    Category: {row['Category']}
-                    Region: {row['Region']}
-                    Inventory Level: {row['Inventory Level']}
-                    Units Sold: {row['Units Sold']}
-                    Units Ordered: {row['Units Ordered']}
-                    Demand Forecast: {row['Demand Forecast']}
-                    Price: {row['Price']}
-                    Discount: {row['Discount']}
-                    Weather: {row['Weather Condition']}
-                    Holiday/Promotion: {row['Holiday/Promotion']}
-                    Competitor Pricing: {row['Competitor Pricing']}
-                    Seasonality: {row['Season']}
-                    Product Type: {row['Category_Type']}
-                    Product Name: {row['Name']}
-                    """
-                    texts.append(text)
-            
-            # Split texts into chunks
-            text_splitter = RecursiveCharacterTextSplitter(
-                chunk_size=self.chunk_size,
-                chunk_overlap=self.chunk_overlap
-            )
+            columns = [df[column].astype(str).tolist() for _, column in RECORD_FIELDS]
+            texts = list(map(RECORD_TEMPLATE, *columns))
             
-            print(f"Splitting {len(texts)} records into chunks...")
-            split_texts = text_splitter.create_documents(texts)
-            result_texts = [doc.page_content for doc in split_texts]
+            # Each record is a small self-contained chunk already; only records
+            # longer than chunk_size go through the splitter
+            lengths = np.fromiter(map(len, texts), dtype=np.int64, count=len(texts))
+            oversized = np.flatnonzero(lengths > self.chunk_size)
+            if len(oversized):
+                print(f"Splitting {len(oversized)} oversized records into chunks...")
+                # Runs of short records are copied over as list slices; Python only
+                # visits the oversized ones
+                result_texts = []
+                previous = 0
+                for i in oversized:
+                    result_texts.extend(texts[previous:i])
+                    result_texts.extend(self.text_splitter.split_text(texts[i]))
+                    previous = i + 1
+                result_texts.extend(texts[previous:])
+            else:
+                result_texts = texts
             
             elapsed_time = time.time() - start_time
             print(f"Data processing completed in {elapsed_time:.2f} seconds")
@@ -150,28 +484,98 @@ class RetailRAGPipeline:
             logger.error(f"Error loading or processing data: {str(e)}")
             raise
     
-    def _create_product_context(self, row: pd.Series) -> str:
+    def _create_product_context(self, df: pd.DataFrame) -> pd.Series:
         """
-        Create a detailed product context string.
+        Create detailed product context strings for every row at once.
         
         Args:
-            row (pd.Series): Product data row
+            df (pd.DataFrame): Product data rows
             
         Returns:
-            str: Formatted product context
+            pd.Series: Formatted product context per row
         """
+        last_updated = datetime.now().strftime('%Y-%m-%d')
+        price = pd.to_numeric(df['Price'], errors='coerce')
         return (
-            f"Product: {row['Name']}\n"
-            f"Category: {row['Category']}\n"
-            f"Current Stock: {row['Inventory Level']}\n"
-            f"Price: ${row['Price']:.2f}\n"
-            f"Historical Sales: {row['Units Sold']}\n"
-            f"Last Updated: {datetime.now().strftime('%Y-%m-%d')}"
+            "Product: " + df['Name'].astype(str)
+            + "\nCategory: " + df['Category'].astype(str)
+            + "\nCurrent Stock: " + df['Inventory Level'].astype(str)
+            + "\nPrice: $" + price.map('{:.2f}'.format)
+            + "\nHistorical Sales: " + df['Units Sold'].astype(str)
+            + f"\nLast Updated: {last_updated}"
         )
     
+    def embed_texts(self, texts: List[str], out: Optional[np.ndarray] = None,
+                    rows: Optional[List[int]] = None) -> np.ndarray:
+        """
+        Embed texts in length-sorted batches, one encoder call at a time.
+        
+        Sorting by length keeps padding within a batch small. The encoder already
+        uses every core and its tokenizer is not safe to share across threads, so
+        batches run in sequence; each is written straight into the output matrix,
+        so no list of per-batch results is held alongside it.
+        
+        Args:
+            texts (List[str]): Texts to embed
+            out (np.ndarray, optional): float32 matrix to write the embeddings into
+            rows (List[int], optional): Row of out for each text (defaults to input order)
+            
+        Returns:
+            np.ndarray: Normalized float32 embeddings, one row per text in input order (or out)
+        """
+        if out is None:
+            out = np.empty((len(texts), self.embeddings.client.get_sentence_embedding_dimension()), dtype=np.float32)
+        rows = np.arange(len(texts)) if rows is None else np.asarray(rows)
+        
+        order = np.argsort([len(text) for text in texts], kind='stable')
+        batches = [order[start:start + self.batch_size] for start in range(0, len(order), self.batch_size)]
+        
+        # Normalized vectors make inner product equal to cosine similarity
+        for batch in batches:
+            out[rows[batch]] = self.embeddings.client.encode(
+                [texts[i] for i in batch],
+                batch_size=self.batch_size,
+                convert_to_numpy=True,
+                normalize_embeddings=True
+            )
+        
+        return out
+    
+    def embed_texts_cached(self, texts: List[str]) -> np.ndarray:
+        """
+        Embed texts, reusing embeddings cached on disk and encoding only the rest.
+        
+        Args:
+            texts (List[str]): Texts to embed
+            
+        Returns:
+            np.ndarray: Normalized float32 embeddings, one row per text in input order
+        """
+        if self.embedding_cache is None:
+            self.embedding_cache = EmbeddingCache()
+        
+        keys = [EmbeddingCache.key(self.model_name, text) for text in texts]
+        cached = self.embedding_cache.get_many(keys)
+        logger.info(f"Embedding cache: {len(cached)} hits, {len(texts) - len(cached)} misses")
+        
+        # Cached and new rows are written into one preallocated matrix
+        embeddings = np.empty((len(texts), self.embeddings.client.get_sentence_embedding_dimension()), dtype=np.float32)
+        missing = []
+        for i, key in enumerate(keys):
+            vector = cached.get(key)
+            if vector is None:
+                missing.append(i)
+            else:
+                embeddings[i] = vector
+        
+        if missing:
+            self.embed_texts([texts[i] for i in missing], out=embeddings, rows=missing)
+            self.embedding_cache.put_many([keys[i] for i in missing], embeddings[missing])
+        return embeddings
+    
     def create_vector_store(self, texts: List[str]) -> None:
         """
-        Create a vector store from the processed texts with progress tracking and batch processing.
+        Create a FAISS vector store from the processed texts, reusing the one saved on disk if it matches.
         
         Args:
             texts (List[str]): List of text chunks to store
@@ -183,62 +587,136 @@ class RetailRAGPipeline:
         print(f"Creating vector store with {len(texts)} text chunks...")
         start_time = time.time()
         
-        # Check if Chroma DB already exists and has the same number of documents
-        try:
-            existing_db = Chroma(
-                persist_directory="./chroma_db",
-                embedding_function=self.embeddings
-            )
-            existing_count = existing_db._collection.count()
-            if (existing_count != len(texts)):
-                print(f"Using existing vector store with {existing_count} documents.")
-                self.vector_store = existing_db
-                return
-            else:
-                print(f"Rebuilding vector store (existing: {existing_count}, new: {len(texts)}).")
-        except Exception as e:
-            print(f"No existing vector store found or error: {str(e)}")
-            
-        # Process in batches with progress bar
-        if len(texts) > 1000:  # Only use batching for large datasets
+        # Cached answers were drawn from the previous documents
+        with self._qcache_lock:
+            self._qcache.clear()
+        
+        # Reuse the saved index only if it was built from the same texts, model and index settings
+        store_key = self._vector_store_key(texts)
+        key_path = os.path.join(self.vector_store_dir, VECTOR_STORE_KEY_FILE)
+        saved_key = None
+        if os.path.exists(key_path):
+            with open(key_path) as f:
+                saved_key = f.read().strip()
+        
+        if saved_key == store_key:
             try:
-                self.vector_store = Chroma(
-                    embedding_function=self.embeddings,
-                    persist_directory="./chroma_db"
+                existing_store = FAISS.load_local(
+                    self.vector_store_dir,
+                    self.embeddings,
+                    allow_dangerous_deserialization=True
                 )
-                
-                batches = [texts[i:i + self.batch_size] for i in range(0, len(texts), self.batch_size)]
-                
-                for i, batch in enumerate(tqdm(batches, desc="Processing batches")):
-                    self.vector_store.add_texts(batch)
-                    if i % 5 == 0:  # Persist every 5 batches
-                        self.vector_store.persist()
-                        print(f"Persisted at batch {i+1}/{len(batches)}")
-                
-                # Final persist
-                self.vector_store.persist()
+                print(f"Using existing vector store with {existing_store.index.ntotal} documents.")
+                _set_search_params(existing_store.index)
+                existing_store.index = to_available_gpus(existing_store.index)
+                self.vector_store = existing_store
+                return
             except Exception as e:
-                logger.error(f"Error in batch processing: {str(e)}")
-                # Fall back to standard processing
-                print("Falling back to standard processing method...")
-                self.vector_store = Chroma.from_texts(
-                    texts=texts,
-                    embedding=self.embeddings,
-                    persist_directory="./chroma_db"
-                )
-        else:
-            # Standard processing for smaller datasets
-            with tqdm(total=1, desc="Creating vector store") as pbar:
-                self.vector_store = Chroma.from_texts(
-                    texts=texts,
-                    embedding=self.embeddings,
-                    persist_directory="./chroma_db"
-                )
-                pbar.update(1)
+                print(f"Could not load existing vector store: {str(e)}")
+        elif saved_key is not None:
+            print("Rebuilding vector store (texts, model or index settings changed).")
+        
+        embeddings = self.embed_texts_cached(texts)
+        # The encoder already normalizes, but fp16 inference and vectors from the cache
+        # only come close to unit length; inner product is cosine only at exactly 1
+        faiss.normalize_L2(embeddings)
+        
+        index = build_faiss_index(embeddings)
+        
+        ids = [str(i) for i in range(len(texts))]
+        self.vector_store = FAISS(
+            embedding_function=self.embeddings,
+            index=index,
+            docstore=InMemoryDocstore({doc_id: Document(page_content=text) for doc_id, text in zip(ids, texts)}),
+            index_to_docstore_id=dict(enumerate(ids)),
+            distance_strategy=DistanceStrategy.MAX_INNER_PRODUCT
+        )
+        # The key is written last, so an interrupted save is never mistaken for a current one
+        if os.path.exists(key_path):
+            os.remove(key_path)
+        self.vector_store.save_local(self.vector_store_dir)
+        with open(key_path, 'w') as f:
+            f.write(store_key)
+        # Only the CPU index can be written, so it moves to the GPU after saving
+        self.vector_store.index = to_available_gpus(index)
         
         elapsed_time = time.time() - start_time
         print(f"Vector store creation completed in {elapsed_time:.2f} seconds.")
     
+    def _vector_store_key(self, texts: List[str]) -> str:
+        """
+        Key of a vector store built from these texts with the current model and index settings.
+        
+        Args:
+            texts (List[str]): Text chunks to store
+            
+        Returns:
+            str: Hex digest identifying the index that would be built
+        """
+        settings = (self.model_name, VECTOR_QUANTIZATION, EXACT_SEARCH_MAX_VECTORS, IVFPQ_MIN_VECTORS)
+        digest = hashlib.blake2b(repr(settings).encode(), digest_size=16)
+        for text in texts:
+            digest.update(text.encode())
+            digest.update(b"\0")
+        return digest.hexdigest()
+    
+    def embed_queries(self, questions: List[str]) -> np.ndarray:
+        """
+        Embed questions for inner-product search against the index.
+        
+        Args:
+            questions (List[str]): Questions to embed
+            
+        Returns:
+            np.ndarray: Unit-length float32 vectors, shape (len(questions), d)
+        """
+        query_vectors = self.embeddings.client.encode(
+            questions,
+            batch_size=self.batch_size,
+            convert_to_numpy=True,
+            normalize_embeddings=True
+        ).astype(np.float32, copy=False)
+        faiss.normalize_L2(query_vectors)
+        return query_vectors
+    
+    def batch_query(self, questions: List[str], k: int = 3) -> List[List[Document]]:
+        """
+        Retrieve the most relevant chunks for several questions with one index search.
+        
+        Args:
+            questions (List[str]): Questions to retrieve context for
+            k (int): Number of chunks per question
+            
+        Returns:
+            List[List[Document]]: Retrieved chunks for each question, most similar first
+        """
+        if self.vector_store is None:
+            raise ValueError("Vector store not initialized. Call create_vector_store() first.")
+        if not questions:
+            return []
+        
+        return self.search_by_vectors(self.embed_queries(questions), k)
+    
+    def search_by_vectors(self, query_vectors: np.ndarray, k: int = 3) -> List[List[Document]]:
+        """
+        Retrieve the most relevant chunks for already embedded questions.
+        
+        Args:
+            query_vectors (np.ndarray): Normalized question embeddings, shape (n, d)
+            k (int): Number of chunks per question
+            
+        Returns:
+            List[List[Document]]: Retrieved chunks for each question, most similar first
+        """
+        _, indices = self.vector_store.index.search(query_vectors, k)
+        
+        docstore = self.vector_store.docstore
+        id_map = self.vector_store.index_to_docstore_id
+        return [
+            [docstore.search(id_map[i]) for i in row if i != -1]
+            for row in indices
+        ]
+    
     def setup_qa_chain(self) -> None:
         """Set up the question-answering chain with a language model."""
         try:
@@ -295,11 +773,12 @@ class RetailRAGPipeline:
             str: Formatted external context
         """
         try:
-            # Get weather impact
-            weather_impact = self.external_analyzer.analyze_weather_impact(city, category)
-            
-            # Get social trends
-            social_trends = self.external_analyzer.analyze_social_trends(product_name)
+            # Fetch weather impact and social trends concurrently; both are network-bound.
+            # The API clients cache successful responses for a few minutes
+            weather_future = _external_executor.submit(self.external_analyzer.analyze_weather_impact, city, category)
+            trends_future = _external_executor.submit(self.external_analyzer.analyze_social_trends, product_name)
+            weather_impact = weather_future.result()
+            social_trends = trends_future.result()
             
             # Format external context
             external_context = f"""
@@ -315,7 +794,7 @@ class RetailRAGPipeline:
             return external_context
         except Exception as e:
             logger.error(f"Error getting external context: {str(e)}")
-            return "External data unavailable"
+            return EXTERNAL_DATA_UNAVAILABLE
     
     def query(
         self,
@@ -340,23 +819,74 @@ class RetailRAGPipeline:
             raise ValueError("QA chain not initialized. Call setup_qa_chain() first.")
         
         try:
+            # Near-duplicates of an earlier question with the same context reuse its answer
+            context_key = (product_name, category, city)
+            question_vector = self._question_embedder(question)[None, :]
+            cached_answer = self._cached_answer(context_key, question_vector)
+            if cached_answer is not None:
+                return cached_answer
+            
             # Get external context if product details are provided
             external_data = ""
             if product_name and category and city:
                 external_data = self.get_external_context(product_name, category, city)
             
-            # Run the query with external context
-            response = self.qa_chain.run(
-                context="",
+            # Retrieve with the vector embedded above instead of letting the
+            # retriever embed the question again, then answer from those chunks
+            documents = self.search_by_vectors(question_vector, k=3)[0]
+            response = self.qa_chain.combine_documents_chain.run(
+                input_documents=documents,
                 external_data=external_data,
                 question=question
             )
             
+            # An answer given without the external data shouldn't outlive the outage
+            if external_data != EXTERNAL_DATA_UNAVAILABLE:
+                self._cache_answer(context_key, question_vector, response)
             return response
         except Exception as e:
             logger.error(f"Error in query: {str(e)}")
             return f"Error processing query: {str(e)}"
     
+    def _cached_answer(self, context_key: tuple, question_vector: np.ndarray) -> Optional[str]:
+        """
+        Answer of the most similar earlier question, if it is similar enough.
+        
+        Args:
+            context_key (tuple): Product name, category and city of the query
+            question_vector (np.ndarray): Normalized question embedding, shape (1, d)
+            
+        Returns:
+            Optional[str]: The cached answer, or None on a miss
+        """
+        with self._qcache_lock:
+            entry = self._qcache.get(context_key)
+            if entry is None or entry[0].ntotal == 0:
+                return None
+            index, answers = entry
+            similarities, ids = index.search(question_vector, 1)
+            if similarities[0, 0] > QUERY_CACHE_THRESHOLD:
+                return answers[ids[0, 0]]
+        return None
+    
+    def _cache_answer(self, context_key: tuple, question_vector: np.ndarray, answer: str) -> None:
+        """
+        Remember an answer for later near-duplicate questions.
+        
+        Args:
+            context_key (tuple): Product name, category and city of the query
+            question_vector (np.ndarray): Normalized question embedding, shape (1, d)
+            answer (str): Answer to cache
+        """
+        with self._qcache_lock:
+            entry = self._qcache.get(context_key)
+            # A full cache starts over rather than tracking per-entry age
+            if entry is None or entry[0].ntotal >= QUERY_CACHE_SIZE:
+                entry = (faiss.IndexFlatIP(question_vector.shape[1]), [])
+                self._qcache[context_key] = entry
+            entry[0].add(question_vector)
+            entry[1].append(answer)
+    
     def initialize_pipeline(self) -> None:
         """Initialize the complete RAG pipeline with progress reporting."""
         try:
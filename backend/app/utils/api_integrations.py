@@ -1,18 +1,289 @@
+import atexit
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.request import ACCEPT_ENCODING
+from urllib3.util.retry import Retry
+from tenacity import retry, retry_if_exception_type, stop_after_attempt, stop_after_delay, wait_exponential_jitter
 import tweepy
+import numpy as np
+import orjson
+from dataclasses import dataclass
 from datetime import datetime, timedelta
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional, Tuple
 import os
+import re
+import functools
+import logging
+import threading
+import time
+from cachetools import LRUCache, cached
+from cachetools.keys import hashkey
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
 
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
+# API credentials, read once at import
+OPENWEATHER_API_KEY = os.getenv('OPENWEATHER_API_KEY')
+TWITTER_API_KEY = os.getenv('TWITTER_API_KEY')
+TWITTER_API_SECRET = os.getenv('TWITTER_API_SECRET')
+TWITTER_ACCESS_TOKEN = os.getenv('TWITTER_ACCESS_TOKEN')
+TWITTER_ACCESS_TOKEN_SECRET = os.getenv('TWITTER_ACCESS_TOKEN_SECRET')
+
+# Report missing credentials at boot instead of on the first failing request; the
+# app still starts, since the external data endpoints are optional
+for _name, _value in [
+    ('OPENWEATHER_API_KEY', OPENWEATHER_API_KEY),
+    ('TWITTER_API_KEY', TWITTER_API_KEY),
+    ('TWITTER_API_SECRET', TWITTER_API_SECRET),
+    ('TWITTER_ACCESS_TOKEN', TWITTER_ACCESS_TOKEN),
+    ('TWITTER_ACCESS_TOKEN_SECRET', TWITTER_ACCESS_TOKEN_SECRET),
+]:
+    if not _value:
+        logger.warning("%s is not set; the external API calls that need it will fail", _name)
+
+# Threads for independent upstream calls, e.g. the forecasts of a city batch
+_api_executor = ThreadPoolExecutor(max_workers=16, thread_name_prefix="external-api")
+
+def ttl_cached(ttl: float, maxsize: int = 512):
+    """
+    Cache a method's results per arguments for ttl seconds
+    
+    Expired entries are kept (up to maxsize, least recently used first out) so that
+    when a refresh fails, the last known value is served instead of the error.
+    
+    Args:
+        ttl (float): Seconds a cached value is fresh
+        maxsize (int): Most argument combinations remembered
+    """
+    def decorator(func):
+        entries = LRUCache(maxsize=maxsize)
+        lock = threading.Lock()
+        
+        @functools.wraps(func)
+        def wrapper(self, *args, **kwargs):
+            key = args + tuple(sorted(kwargs.items()))
+            now = time.monotonic()
+            with lock:
+                entry = entries.get(key)
+            if entry is not None and entry[0] > now:
+                return entry[1]
+            
+            try:
+                value = func(self, *args, **kwargs)
+            except Exception as e:
+                if entry is None:
+                    raise
+                logger.warning("Serving stale %s result after error: %s", func.__name__, e)
+                return entry[1]
+            
+            with lock:
+                entries[key] = (now + ttl, value)
+            return value
+        
+        return wrapper
+    return decorator
+
+
+class RateLimiter:
+    """Thread-safe token bucket allowing `rate` calls per `period` seconds, in bursts of up to `rate`"""
+    
+    def __init__(self, rate: float, period: float):
+        """
+        Args:
+            rate (float): Calls allowed per period
+            period (float): Length of the period in seconds
+        """
+        self.capacity = rate
+        self.tokens = float(rate)
+        self.fill_rate = rate / period
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+        
+    def try_acquire(self) -> float:
+        """
+        Use up a call if one is allowed now
+        
+        Returns:
+            float: 0 if the call was taken, otherwise the seconds until one is allowed
+        """
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.fill_rate)
+            self.updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return 0.0
+            return (1 - self.tokens) / self.fill_rate
+        
+    def acquire(self) -> None:
+        """Block until a call is allowed, then use it up"""
+        while True:
+            wait = self.try_acquire()
+            if not wait:
+                return
+            time.sleep(wait)
+
+
+class RateLimitExceeded(RuntimeError):
+    """Raised instead of waiting when a host's request budget is used up"""
+
+
+# Per-host limits on concurrent requests and on request rate, kept under the upstream
+# quotas (Twitter: 350 requests/hour; OpenWeather free tier: 60/minute) so bursts
+# queue here instead of tripping 429s and their long recovery
+_twitter_slots = threading.BoundedSemaphore(8)
+_twitter_rate = RateLimiter(340, 3600)
+_openweather_slots = threading.BoundedSemaphore(8)
+_openweather_rate = RateLimiter(60, 60)
+
+# (connect, read) timeouts for OpenWeather requests, so a stalled call can't hold a slot
+OPENWEATHER_TIMEOUT = (3.05, 10)
+
+# Seconds after which a rate-limited Twitter call stops retrying
+TWITTER_RETRY_DEADLINE = 20
+
+
+@retry(
+    wait=wait_exponential_jitter(initial=1, max=8),
+    stop=stop_after_attempt(5) | stop_after_delay(TWITTER_RETRY_DEADLINE),
+    retry=retry_if_exception_type(tweepy.TooManyRequests),
+    reraise=True
+)
+def _call_twitter(method, *args, **kwargs):
+    """
+    Call a tweepy client method, backing off with jitter and retrying while rate limited
+    
+    Only 429 responses are retried, for up to TWITTER_RETRY_DEADLINE seconds;
+    authentication errors (tweepy.Unauthorized, tweepy.Forbidden) and everything
+    else raise immediately. Every attempt counts against the Twitter rate limit,
+    and an attempt with no budget left raises RateLimitExceeded rather than
+    waiting for the bucket to refill (about 10 seconds per call).
+    """
+    if _twitter_rate.try_acquire():
+        raise RateLimitExceeded("Twitter request budget used up")
+    with _twitter_slots:
+        return method(*args, **kwargs)
+
+
+@dataclass
+class WeatherForecast:
+    """Forecast entries as parallel arrays, one element per 3-hour step"""
+    timestamp: np.ndarray    # datetime64[s], UTC
+    temperature: np.ndarray  # float64, degrees Celsius
+    humidity: np.ndarray     # float64, percent
+    weather: np.ndarray      # str, condition group such as 'Rain'
+    description: np.ndarray  # str
+    
+    @classmethod
+    def empty(cls) -> "WeatherForecast":
+        """A forecast with no entries"""
+        return cls(
+            timestamp=np.empty(0, dtype='datetime64[s]'),
+            temperature=np.empty(0, dtype=np.float64),
+            humidity=np.empty(0, dtype=np.float64),
+            weather=np.empty(0, dtype=str),
+            description=np.empty(0, dtype=str)
+        )
+    
+    def __len__(self) -> int:
+        return len(self.timestamp)
+    
+    def to_records(self) -> List[Dict[str, Any]]:
+        """
+        Convert to one dict per entry, e.g. for a JSON response
+        
+        Returns:
+            List[Dict[str, Any]]: Entries with naive UTC timestamps
+        """
+        # tolist() converts every column to Python objects in bulk; the timestamps
+        # come out as datetimes without a per-entry time zone lookup
+        return [
+            {
+                'timestamp': timestamp,
+                'temperature': temperature,
+                'humidity': humidity,
+                'weather': weather,
+                'description': description
+            }
+            for timestamp, temperature, humidity, weather, description in zip(
+                self.timestamp.tolist(), self.temperature.tolist(), self.humidity.tolist(),
+                self.weather.tolist(), self.description.tolist()
+            )
+        ]
+
 class WeatherAPI:
     def __init__(self):
-        self.api_key = os.getenv('OPENWEATHER_API_KEY')
+        self.api_key = OPENWEATHER_API_KEY
         self.base_url = "http://api.openweathermap.org/data/2.5"
         
-    def get_weather_forecast(self, city: str, days: int = 7) -> List[Dict[str, Any]]:
+        # Pooled keep-alive connections, so the forecast call reuses the connection
+        # opened for the city lookup; transient upstream errors are retried with backoff.
+        # 429 is left out: those retries would bypass the rate limiter's token bucket
+        self.session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=4,
+            pool_maxsize=16,  # one connection per concurrent external-api thread
+            max_retries=Retry(total=3, backoff_factor=0.3, status_forcelist=[500, 502, 503, 504])
+        )
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        # Every compression urllib3 can decode here (br only when brotli is installed)
+        self.session.headers.update({"Accept-Encoding": ACCEPT_ENCODING})
+        atexit.register(self.close)
+        
+        # Last body and validators per request, for conditional GETs:
+        # (url, params) -> (etag, last_modified, parsed JSON)
+        self._validated = LRUCache(maxsize=256)
+        self._validated_lock = threading.Lock()
+        
+    def close(self):
+        """Close the pooled HTTP connections"""
+        self.session.close()
+        
+    def _get_json(self, url: str, params: Dict[str, Any]) -> Any:
+        """
+        GET a JSON resource, revalidating an earlier copy with If-None-Match / If-Modified-Since
+        
+        Args:
+            url (str): Resource URL
+            params (Dict[str, Any]): Query parameters
+            
+        Returns:
+            Any: The parsed JSON body (the earlier copy on 304 Not Modified); error
+                statuses raise requests.HTTPError
+        """
+        key = (url, tuple(sorted(params.items())))
+        with self._validated_lock:
+            previous = self._validated.get(key)
+        
+        headers = {}
+        if previous is not None:
+            etag, last_modified, _ = previous
+            if etag:
+                headers["If-None-Match"] = etag
+            if last_modified:
+                headers["If-Modified-Since"] = last_modified
+        
+        # Wait for the rate limit before taking a slot, so waiting doesn't hold one
+        _openweather_rate.acquire()
+        with _openweather_slots:
+            response = self.session.get(url, params=params, headers=headers, timeout=OPENWEATHER_TIMEOUT)
+        if response.status_code == 304 and previous is not None:
+            return previous[2]
+        # Error bodies aren't the resource, so they are neither parsed nor cached
+        response.raise_for_status()
+        
+        data = orjson.loads(response.content)
+        etag, last_modified = response.headers.get("ETag"), response.headers.get("Last-Modified")
+        if etag or last_modified:
+            with self._validated_lock:
+                self._validated[key] = (etag, last_modified, data)
+        return data
+        
+    def get_weather_forecast(self, city: str, days: int = 7) -> WeatherForecast:
         """
         Get weather forecast for the specified city
         
@@ -21,60 +292,79 @@ class WeatherAPI:
             days (int): Number of days to forecast
             
         Returns:
-            List[Dict[str, Any]]: Weather forecast data
+            WeatherForecast: Weather forecast data (empty on error)
         """
         try:
-            # Get city coordinates
-            geo_url = f"{self.base_url}/weather"
-            params = {
-                'q': city,
-                'appid': self.api_key,
-                'units': 'metric'
-            }
-            response = requests.get(geo_url, params=params)
-            data = response.json()
-            
-            if 'coord' not in data:
-                raise ValueError(f"Could not find city: {city}")
-                
-            lat, lon = data['coord']['lat'], data['coord']['lon']
-            
-            # Get forecast
-            forecast_url = f"{self.base_url}/forecast"
-            params = {
-                'lat': lat,
-                'lon': lon,
-                'appid': self.api_key,
-                'units': 'metric',
-                'cnt': days * 8  # 8 forecasts per day
-            }
+            return self._fetch_weather_forecast(city, days)
+        except Exception:
+            logger.warning("Error fetching weather data for %s", city, exc_info=True)
+            return WeatherForecast.empty()
+    
+    # City coordinates never change, so successful lookups are kept for the process
+    # lifetime (shared by all instances; failed lookups are not cached)
+    @cached(LRUCache(maxsize=4096), key=lambda self, city: hashkey(city), lock=threading.Lock())
+    def _geocode(self, city: str) -> Tuple[float, float]:
+        """
+        Resolve a city name to its coordinates
+        
+        Args:
+            city (str): City name
             
-            response = requests.get(forecast_url, params=params)
-            forecast_data = response.json()
-            
-            # Process and format forecast data
-            processed_forecast = []
-            for item in forecast_data['list']:
-                processed_forecast.append({
-                    'timestamp': datetime.fromtimestamp(item['dt']),
-                    'temperature': item['main']['temp'],
-                    'humidity': item['main']['humidity'],
-                    'weather': item['weather'][0]['main'],
-                    'description': item['weather'][0]['description']
-                })
-                
-            return processed_forecast
+        Returns:
+            Tuple[float, float]: Latitude and longitude
+        """
+        geo_url = f"{self.base_url}/weather"
+        params = {
+            'q': city,
+            'appid': self.api_key,
+            'units': 'metric'
+        }
+        data = self._get_json(geo_url, params)
+        
+        if 'coord' not in data:
+            raise ValueError(f"Could not find city: {city}")
             
-        except Exception as e:
-            print(f"Error fetching weather data: {str(e)}")
-            return []
+        return data['coord']['lat'], data['coord']['lon']
+    
+    @ttl_cached(ttl=600)
+    def _fetch_weather_forecast(self, city: str, days: int) -> WeatherForecast:
+        """
+        Fetch the forecast from OpenWeather, cached for 10 minutes per (city, days)
+        
+        Raises on upstream errors unless an earlier result can be served instead.
+        """
+        # Get city coordinates
+        lat, lon = self._geocode(city)
+        
+        # Get forecast
+        forecast_url = f"{self.base_url}/forecast"
+        params = {
+            'lat': lat,
+            'lon': lon,
+            'appid': self.api_key,
+            'units': 'metric',
+            'cnt': days * 8  # 8 forecasts per day
+        }
+        
+        forecast_data = self._get_json(forecast_url, params)
+        
+        # Process forecast data into one array per field
+        items = forecast_data['list']
+        count = len(items)
+        return WeatherForecast(
+            timestamp=np.fromiter((item['dt'] for item in items), dtype=np.int64, count=count).view('datetime64[s]'),
+            temperature=np.fromiter((item['main']['temp'] for item in items), dtype=np.float64, count=count),
+            humidity=np.fromiter((item['main']['humidity'] for item in items), dtype=np.float64, count=count),
+            weather=np.array([item['weather'][0]['main'] for item in items], dtype=str),
+            description=np.array([item['weather'][0]['description'] for item in items], dtype=str)
+        )
 
 class TwitterAPI:
     def __init__(self):
-        self.api_key = os.getenv('TWITTER_API_KEY')
-        self.api_secret = os.getenv('TWITTER_API_SECRET')
-        self.access_token = os.getenv('TWITTER_ACCESS_TOKEN')
-        self.access_token_secret = os.getenv('TWITTER_ACCESS_TOKEN_SECRET')
+        self.api_key = TWITTER_API_KEY
+        self.api_secret = TWITTER_API_SECRET
+        self.access_token = TWITTER_ACCESS_TOKEN
+        self.access_token_secret = TWITTER_ACCESS_TOKEN_SECRET
         
         # Initialize Twitter client
         self.client = tweepy.Client(
@@ -95,33 +385,41 @@ class TwitterAPI:
             List[Dict[str, Any]]: Trending topics data
         """
         try:
-            # Get location ID
-            available_locations = self.client.available_trends()
-            location_id = next(
-                (loc['woeid'] for loc in available_locations if loc['name'].lower() == location.lower()),
-                None
-            )
-            
-            if not location_id:
-                location_id = 1  # Default to worldwide
-            
-            # Get trends
-            trends = self.client.get_place_trends(location_id)
-            
-            # Process and format trends data
-            processed_trends = []
-            for trend in trends[0]['trends']:
-                processed_trends.append({
-                    'name': trend['name'],
-                    'tweet_volume': trend.get('tweet_volume', 0),
-                    'url': trend['url']
-                })
-                
-            return processed_trends
-            
-        except Exception as e:
-            print(f"Error fetching Twitter trends: {str(e)}")
+            return self._fetch_trending_topics(location)
+        except Exception:
+            logger.warning("Error fetching Twitter trends for %s", location, exc_info=True)
             return []
+    
+    @ttl_cached(ttl=300)
+    def _fetch_trending_topics(self, location: str) -> List[Dict[str, Any]]:
+        """
+        Fetch trending topics from Twitter, cached for 5 minutes per location
+        
+        Raises on upstream errors unless an earlier result can be served instead.
+        """
+        # Get location ID
+        available_locations = _call_twitter(self.client.available_trends)
+        location_id = next(
+            (loc['woeid'] for loc in available_locations if loc['name'].lower() == location.lower()),
+            None
+        )
+        
+        if not location_id:
+            location_id = 1  # Default to worldwide
+        
+        # Get trends
+        trends = _call_twitter(self.client.get_place_trends, location_id)
+        
+        # Process and format trends data
+        processed_trends = []
+        for trend in trends[0]['trends']:
+            processed_trends.append({
+                'name': trend['name'],
+                'tweet_volume': trend.get('tweet_volume', 0),
+                'url': trend['url']
+            })
+            
+        return processed_trends
             
     def search_tweets(self, query: str, count: int = 100) -> List[Dict[str, Any]]:
         """
@@ -135,7 +433,8 @@ class TwitterAPI:
             List[Dict[str, Any]]: Tweet data
         """
         try:
-            tweets = self.client.search_recent_tweets(
+            tweets = _call_twitter(
+                self.client.search_recent_tweets,
                 query=query,
                 max_results=count,
                 tweet_fields=['created_at', 'public_metrics']
@@ -152,14 +451,34 @@ class TwitterAPI:
                 
             return processed_tweets
             
-        except Exception as e:
-            print(f"Error searching tweets: {str(e)}")
+        except Exception:
+            logger.warning("Error searching tweets for %s", query, exc_info=True)
             return []
 
+# API clients are created lazily, once per process, so every analyzer and endpoint
+# shares the same requests Session and tweepy client
+@functools.lru_cache(maxsize=1)
+def get_weather_api() -> WeatherAPI:
+    return WeatherAPI()
+
+@functools.lru_cache(maxsize=1)
+def get_twitter_api() -> TwitterAPI:
+    return TwitterAPI()
+
 class ExternalDataAnalyzer:
-    def __init__(self):
-        self.weather_api = WeatherAPI()
-        self.twitter_api = TwitterAPI()
+    # Product categories whose demand reacts to hot weather, cold weather and rain
+    HOT_CATS = frozenset({'beverages', 'ice_cream'})
+    COLD_CATS = frozenset({'hot_drinks', 'soup'})
+    RAIN_CATS = frozenset({'umbrellas', 'raincoats'})
+    WEATHER_SENSITIVE_CATS = HOT_CATS | COLD_CATS | RAIN_CATS
+    
+    @property
+    def weather_api(self) -> WeatherAPI:
+        return get_weather_api()
+    
+    @property
+    def twitter_api(self) -> TwitterAPI:
+        return get_twitter_api()
         
     def analyze_weather_impact(self, city: str, product_category: str) -> Dict[str, Any]:
         """
@@ -172,8 +491,45 @@ class ExternalDataAnalyzer:
         Returns:
             Dict[str, Any]: Weather impact analysis
         """
+        # No rule applies to other categories, so the forecast isn't needed at all
+        if product_category not in self.WEATHER_SENSITIVE_CATS:
+            return self._weather_impact(None, product_category)
+        
         forecast = self.weather_api.get_weather_forecast(city)
+        return self._weather_impact(forecast, product_category)
+    
+    def analyze_weather_impact_batch(self, cities: List[str], product_category: str) -> Dict[str, Dict[str, Any]]:
+        """
+        Analyze weather impact for several cities, fetching their forecasts concurrently
         
+        Args:
+            cities (List[str]): Cities to analyze
+            product_category (str): Product category to analyze
+            
+        Returns:
+            Dict[str, Dict[str, Any]]: Weather impact analysis per city
+        """
+        if product_category not in self.WEATHER_SENSITIVE_CATS:
+            return {city: self._weather_impact(None, product_category) for city in cities}
+        
+        # Latency is the slowest forecast rather than the sum of them
+        forecasts = _api_executor.map(self.weather_api.get_weather_forecast, cities)
+        return {
+            city: self._weather_impact(forecast, product_category)
+            for city, forecast in zip(cities, forecasts)
+        }
+    
+    def _weather_impact(self, forecast: Optional[WeatherForecast], product_category: str) -> Dict[str, Any]:
+        """
+        Score a forecast against the weather rules for a category
+        
+        Args:
+            forecast (WeatherForecast, optional): Forecast to score (unused when no rule applies)
+            product_category (str): Product category to analyze
+            
+        Returns:
+            Dict[str, Any]: Weather impact analysis
+        """
         # Simple impact analysis based on weather conditions
         impact = {
             'temperature_impact': 0,
@@ -181,19 +537,18 @@ class ExternalDataAnalyzer:
             'recommendations': []
         }
         
-        for day in forecast:
-            # Temperature impact
-            if day['temperature'] > 25:  # Hot weather
-                if product_category in ['beverages', 'ice_cream']:
-                    impact['temperature_impact'] += 1
-            elif day['temperature'] < 10:  # Cold weather
-                if product_category in ['hot_drinks', 'soup']:
-                    impact['temperature_impact'] += 1
-                    
-            # Weather condition impact
-            if day['weather'] == 'Rain':
-                if product_category in ['umbrellas', 'raincoats']:
-                    impact['weather_impact'] += 1
+        if forecast is None:
+            return impact
+        
+        # Temperature impact
+        if product_category in self.HOT_CATS:  # Hot weather
+            impact['temperature_impact'] += int(np.count_nonzero(forecast.temperature > 25))
+        if product_category in self.COLD_CATS:  # Cold weather
+            impact['temperature_impact'] += int(np.count_nonzero(forecast.temperature < 10))
+            
+        # Weather condition impact
+        if product_category in self.RAIN_CATS:
+            impact['weather_impact'] += int(np.count_nonzero(forecast.weather == 'Rain'))
                     
         return impact
         
@@ -207,8 +562,11 @@ class ExternalDataAnalyzer:
         Returns:
             Dict[str, Any]: Social trends analysis
         """
-        tweets = self.twitter_api.search_tweets(product_name)
-        trends = self.twitter_api.get_trending_topics()
+        # The two Twitter calls are independent, so they run concurrently
+        tweets_future = _api_executor.submit(self.twitter_api.search_tweets, product_name)
+        trends_future = _api_executor.submit(self.twitter_api.get_trending_topics)
+        tweets = tweets_future.result()
+        trends = trends_future.result()
         
         analysis = {
             'tweet_volume': len(tweets),
@@ -218,8 +576,64 @@ class ExternalDataAnalyzer:
         }
         
         # Check if product is related to any trending topics
-        for trend in trends:
-            if product_name.lower() in trend['name'].lower():
-                analysis['trending_related'].append(trend)
+        needle = product_name.casefold()
+        analysis['trending_related'] = [trend for trend in trends if needle in trend['name'].casefold()]
                 
-        return analysis 
\ No newline at end of file
+        return analysis
+    
+    def analyze_social_trends_batch(self, product_names: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Analyze social media trends for several products against one fetch of the trending topics
+        
+        Args:
+            product_names (List[str]): Products to analyze
+            
+        Returns:
+            Dict[str, Dict[str, Any]]: Social trends analysis per product
+        """
+        # One trends fetch serves every product; the tweet searches run concurrently
+        trends_future = _api_executor.submit(self.twitter_api.get_trending_topics)
+        tweet_futures = {name: _api_executor.submit(self.twitter_api.search_tweets, name) for name in set(product_names)}
+        related = self._match_trends(product_names, trends_future.result())
+        
+        return {
+            name: {
+                'tweet_volume': len(tweet_futures[name].result()),
+                'average_sentiment': 0,
+                'trending_related': related[name],
+                'recommendations': []
+            }
+            for name in product_names
+        }
+    
+    @staticmethod
+    def _match_trends(product_names: List[str], trends: List[Dict[str, Any]]) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Find the trending topics whose name contains each product name (case-insensitive)
+        
+        Args:
+            product_names (List[str]): Products to match
+            trends (List[Dict[str, Any]]): Trending topics
+            
+        Returns:
+            Dict[str, List[Dict[str, Any]]]: Matching trends per product
+        """
+        needles = {name: name.casefold() for name in product_names}
+        results = {name: [] for name in product_names}
+        if not needles:
+            return results
+        
+        # One compiled scan per trend name rules out trends mentioning no product at all;
+        # only the rest are checked product by product
+        any_product = re.compile('|'.join(map(re.escape, sorted(set(needles.values()), key=len, reverse=True))))
+        for trend in trends:
+            trend_name = trend['name'].casefold()
+            if any_product.search(trend_name):
+                for name, needle in needles.items():
+                    if needle in trend_name:
+                        results[name].append(trend)
+        return results
+
+@functools.lru_cache(maxsize=1)
+def get_external_analyzer() -> ExternalDataAnalyzer:
+    return ExternalDataAnalyzer()
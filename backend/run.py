@@ -1,15 +1,39 @@
 #!/usr/bin/env python3
 
+import hashlib
 import os
 import subprocess
 import sys
 import time
 
+# Hash of the requirements (and interpreter) pip last installed successfully
+DEPS_HASH_FILE = ".deps_hash"
+
+def requirements_hash():
+    """Hash of requirements.txt together with the interpreter it is installed into"""
+    with open("requirements.txt", "rb") as f:
+        return hashlib.blake2b(f.read() + sys.executable.encode()).hexdigest()
+
 def check_dependencies():
     """Check if all required dependencies are installed"""
+    current_hash = requirements_hash()
+    try:
+        with open(DEPS_HASH_FILE) as f:
+            if f.read().strip() == current_hash:
+                return True
+    except FileNotFoundError:
+        pass
+    
+    # Set AUTO_INSTALL_DEPS=0 (e.g. in production) to never run pip at startup
+    if os.getenv("AUTO_INSTALL_DEPS", "1") == "0":
+        print("requirements.txt changed since the last install; skipping pip (AUTO_INSTALL_DEPS=0)")
+        return True
+    
     try:
         print("Checking dependencies...")
         subprocess.check_call([sys.executable, "-m", "pip", "install", "-r", "requirements.txt"])
+        with open(DEPS_HASH_FILE, "w") as f:
+            f.write(current_hash)
         print("All dependencies installed successfully!")
         return True
     except subprocess.CalledProcessError:
@@ -18,11 +42,27 @@ def check_dependencies():
 
 def run_application():
     """Run the FastAPI application using uvicorn"""
+    # Imported here so a first run can install uvicorn in check_dependencies()
+    import uvicorn
+    
     try:
+        # The app reads its data files relative to the app directory
         os.chdir("app")
         print("Starting the retail demand forecasting application...")
         print("The server will be available at http://localhost:8000")
-        subprocess.call([sys.executable, "-m", "uvicorn", "main:app", "--reload", "--host", "0.0.0.0", "--port", "8000"])
+        # Served in this process (no uvicorn subprocess); DEV=1 reloads on code
+        # changes. Settings and the forecast cache live in each worker, so a single
+        # worker unless WEB_CONCURRENCY asks for more
+        uvicorn.run(
+            "main:app",
+            app_dir=".",
+            host="0.0.0.0",
+            port=8000,
+            workers=int(os.getenv("WEB_CONCURRENCY", "1")),
+            loop="auto",  # uvloop when installed, asyncio otherwise (e.g. on Windows)
+            http="httptools",
+            reload=bool(os.getenv("DEV"))
+        )
     except KeyboardInterrupt:
         print("\nShutting down the server...")
     except Exception as e: